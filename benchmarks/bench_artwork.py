@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the SteamGridDB artwork paths against the local stub server.
+
+Measures, fully offline:
+  - a cold search plus icon listing, and the same search answered from the
+    response cache
+  - a bulk artwork run over a synthetic library with one worker and with
+    several, including the downloads into a throwaway artwork store
+
+Usage:
+    python3 benchmarks/bench_artwork.py [--games 40] [--latency 0.05] [--error-rate 0.0] [--workers 4]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from steamgrid_stub import StubServer
+from umu_launcher.steamgrid_api import SteamGridDB
+from umu_launcher.response_cache import ResponseCache
+from umu_launcher.artwork_store import ArtworkStore
+from umu_launcher.artwork_fetcher import ArtworkFetcher
+
+def bench_search(server, work_dir, queries):
+    """Time searches cold and then from the response cache"""
+    cache = ResponseCache(os.path.join(work_dir, 'responses.sqlite3'))
+    client = SteamGridDB('bench', base_url=server.base_url, cache=cache, rate=0)
+    try:
+        timings = {}
+        for label in ('cold', 'cached'):
+            start = time.perf_counter()
+            for query in queries:
+                games = client.search_games(query)
+                client.get_icons(games[0]['id'])
+            timings[label] = (time.perf_counter() - start) / len(queries)
+        return timings
+    finally:
+        client.close()
+        cache.close()
+
+def bench_bulk(server, work_dir, games, workers, rate):
+    """Time an artwork run over the library with a fresh store"""
+    store_dir = tempfile.mkdtemp(dir=work_dir)
+    client = SteamGridDB('bench', base_url=server.base_url, max_workers=workers, rate=0, backoff=0.05)
+    store = ArtworkStore(store_dir)
+    fetcher = ArtworkFetcher(client, store, os.path.join(store_dir, 'state.json'),
+                             rate=rate, burst=rate, max_workers=workers)
+    done = threading.Event()
+    result = {}
+
+    def on_done(found, tried):
+        result['found'] = found
+        result['tried'] = tried
+        done.set()
+
+    try:
+        start = time.perf_counter()
+        fetcher.start(games, lambda game_path, icon_path: None, on_done)
+        done.wait()
+        result['seconds'] = time.perf_counter() - start
+        return result
+    finally:
+        client.close()
+        store.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SteamGridDB artwork fetching offline')
+    parser.add_argument('--games', type=int, default=40, help='Games in the synthetic library')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds the stub delays each response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API requests failing')
+    parser.add_argument('--image-bytes', type=int, default=16384, help='Approximate size of served images')
+    parser.add_argument('--workers', type=int, default=4, help='Parallel workers of the bulk run')
+    parser.add_argument('--rate', type=int, default=1000, help='Requests per second allowed to the bulk run')
+    args = parser.parse_args()
+
+    games = [(f"/games/game{i}/game.exe", f"Benchmark Game {i}") for i in range(args.games)]
+    work_dir = tempfile.mkdtemp(prefix='umu-bench-')
+    server = StubServer(latency=args.latency, error_rate=args.error_rate, image_bytes=args.image_bytes).start()
+    try:
+        print(f"stub at {server.base_url}, {args.latency * 1000:.0f} ms latency, "
+              f"{args.error_rate:.0%} errors, {args.image_bytes} byte images")
+
+        timings = bench_search(server, work_dir, [name for _, name in games[:10]])
+        print(f"search + icon listing, cold:   {timings['cold'] * 1000:8.1f} ms")
+        print(f"search + icon listing, cached: {timings['cached'] * 1000:8.1f} ms")
+
+        serial = bench_bulk(server, work_dir, games, 1, args.rate)
+        print(f"bulk fetch, 1 worker:  {serial['seconds']:6.2f} s "
+              f"({serial['found']}/{serial['tried']} icons)")
+        parallel = bench_bulk(server, work_dir, games, args.workers, args.rate)
+        print(f"bulk fetch, {args.workers} workers: {parallel['seconds']:6.2f} s "
+              f"({parallel['found']}/{parallel['tried']} icons, {serial['seconds'] / parallel['seconds']:.1f}x)")
+        print(f"stub served {server.stats['requests']} requests, {server.stats['errors']} errors, "
+              f"{server.stats['not_modified']} not modified")
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
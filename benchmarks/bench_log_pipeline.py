@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the log line pipeline (control character stripping,
+timestamp detection and ANSI parsing) in lines per second.
+
+Usage:
+    python3 benchmarks/bench_log_pipeline.py [captured-proton.log] [--repeat N]
+
+Without a log file a synthetic Proton/DXVK style log is used. The previous
+per-character pipeline is measured alongside for comparison.
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from umu_launcher.ansi import ANSI_COLORS, parse_ansi, strip_control, TIMESTAMP_PATTERN
+
+def synthetic_log(lines=200000, seed=1):
+    """Generate output resembling a Proton session with some colored lines"""
+    rng = random.Random(seed)
+    templates = [
+        "{tid:04x}:fixme:d3d:wined3d_guess_card_vendor Received unrecognized GL_VENDOR \"AMD\".\n",
+        "{tid:04x}:err:module:import_dll Library MSVCP140.dll (needed by L\"C:\\\\Game\\\\game.exe\") not found\n",
+        "{tid:04x}:warn:seh:dispatch_exception unhandled exception code c0000005\n",
+        "info:  DXVK: v2.3\n",
+        "\x1b[1;32minfo:\x1b[0m  Game: game.exe\n",
+        "\x1b[33mwarn:\x1b[0m  D3D11CoreCreateDevice: Ignoring unsupported feature level\n",
+        "ProtonFixes[{tid}] INFO: Running protonfix for gameid {tid}\n",
+    ]
+    return [rng.choice(templates).format(tid=rng.randrange(0x10000)) for _ in range(lines)]
+
+def legacy_pipeline(text, colors):
+    """The pipeline as it was before the fast path"""
+    text = ''.join(char for char in text if char >= ' ' or char in '\n\r\t')
+    timestamp_match = re.match(r'^\[(\d{2}:\d{2}:\d{2})\]\s*', text)
+    if timestamp_match:
+        text = text[len(timestamp_match.group(0)):]
+
+    result = []
+    current_tags = set()
+    ansi_pattern = re.compile(r'(?:\x1B|\[)(?:\[[0-9;]*[@-~]|\[.*?[@-~]|[0-9;]*[mK])')
+    last_end = 0
+    for match in ansi_pattern.finditer(text):
+        if match.start() > last_end:
+            result.append((text[last_end:match.start()], list(current_tags)))
+        code = match.group()
+        if 'm' in code:
+            for c in code.strip('[]m').split(';'):
+                if c == '0' or not c:
+                    current_tags.clear()
+                elif c == '1':
+                    current_tags.add('bold')
+                elif c in colors:
+                    current_tags = {tag for tag in current_tags if not tag.startswith('ansi_')}
+                    current_tags.add(f'ansi_{c}')
+        last_end = match.end()
+    if last_end < len(text):
+        result.append((text[last_end:], list(current_tags)))
+    return result
+
+def current_pipeline(text, colors):
+    """The pipeline used by LogWindow.format_line"""
+    text = strip_control(text)
+    timestamp_match = TIMESTAMP_PATTERN.match(text)
+    if timestamp_match:
+        text = text[timestamp_match.end():]
+    return parse_ansi(text)
+
+def measure(pipeline, lines, colors, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            pipeline(line, colors)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the log line pipeline')
+    parser.add_argument('log_file', nargs='?', help='Captured game log to replay')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per pipeline (best is reported)')
+    args = parser.parse_args()
+
+    if args.log_file:
+        with open(args.log_file, 'r', errors='replace') as f:
+            lines = f.readlines()
+        source = args.log_file
+    else:
+        lines = synthetic_log()
+        source = 'synthetic Proton log'
+
+    colors = ANSI_COLORS
+    escaped = sum(1 for line in lines if '\x1b' in line)
+    print(f"{len(lines)} lines from {source} ({escaped} with escape sequences)")
+
+    legacy = measure(legacy_pipeline, lines, colors, args.repeat)
+    current = measure(current_pipeline, lines, colors, args.repeat)
+    print(f"legacy pipeline:  {legacy:12,.0f} lines/s")
+    print(f"current pipeline: {current:12,.0f} lines/s ({current / legacy:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the SteamGridDB API, for working on artwork offline.
+
+Serves search/autocomplete, icons/grids/heroes/logos listings and image
+downloads with configurable latency, error rate and image size. Results
+are derived from the search term, so the same query always returns the
+same games and icons.
+
+Usage:
+    python3 benchmarks/steamgrid_stub.py [--port 8765] [--latency 0.05] [--error-rate 0.1]
+
+Then point the launcher at it:
+    python3 main.py --steamgrid-url http://127.0.0.1:8765/api/v2
+"""
+
+import re
+import sys
+import json
+import time
+import zlib
+import struct
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+API_PREFIX = '/api/v2/'
+LISTING_PATTERN = re.compile(r'^(icons|grids|heroes|logos)/game/(\d+)$')
+IMAGE_PATTERN = re.compile(r'^/images/(\d+)-(\d+)\.png$')
+
+def make_png(seed, size):
+    """
+    Build a valid PNG of roughly size bytes
+
+    The pixels are noise stored without compression, so the file size
+    follows the pixel count.
+    """
+    side = max(1, int((size / 3) ** 0.5))
+    rng = random.Random(seed)
+    raw = b''.join(b'\0' + bytes(rng.getrandbits(8) for _ in range(side * 3)) for _ in range(side))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    return (b'\x89PNG\r\n\x1a\n' +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', side, side, 8, 2, 0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(raw, 0)) +
+            chunk(b'IEND', b''))
+
+class StubServer:
+    """SteamGridDB stand-in running on a background thread"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 image_bytes=16384, games_per_search=3, icons_per_game=5, seed=0):
+        """
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks a free one)
+            latency: Seconds each response is delayed
+            jitter: Random extra delay of up to this many seconds
+            error_rate: Fraction of API requests failing with 503 or 429
+            image_bytes: Approximate size of served images
+            games_per_search: Games returned by a search
+            icons_per_game: Artwork returned by a listing
+            seed: Seed of the error and jitter randomness
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.image_bytes = image_bytes
+        self.games_per_search = games_per_search
+        self.icons_per_game = icons_per_game
+        self.rng = random.Random(seed)
+        self.stats = {'requests': 0, 'errors': 0, 'not_modified': 0, 'images': 0}
+        self._lock = threading.Lock()
+        self._images = {}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """URL to pass as the SteamGridDB base URL"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX.rstrip('/')}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _delay(self):
+        with self._lock:
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _should_fail(self):
+        with self._lock:
+            return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def image(self, game_id, index):
+        with self._lock:
+            key = (game_id, index)
+            if key not in self._images:
+                self._images[key] = make_png(game_id * 1000 + index, self.image_bytes)
+            return self._images[key]
+
+    def search(self, term):
+        """Games matching a search term"""
+        if not term.strip():
+            return []
+        base = zlib.crc32(term.lower().encode('utf-8')) % 1000000
+        return [
+            {'id': base * 10 + i, 'name': term if i == 0 else f"{term} {i + 1}",
+             'types': ['steam'], 'verified': i == 0}
+            for i in range(self.games_per_search)
+        ]
+
+    def listing(self, kind, game_id, host):
+        """Artwork of a game"""
+        return [
+            {'id': game_id * 100 + i, 'style': 'official', 'width': 256, 'height': 256,
+             'mime': 'image/png', 'url': f"http://{host}/images/{game_id}-{i}.png",
+             'thumb': f"http://{host}/images/{game_id}-{i}.png", 'type': kind}
+            for i in range(self.icons_per_game)
+        ]
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately, don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_body(self, status, body, content_type, extra_headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (extra_headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            def send_json(self, status, payload, extra_headers=None):
+                body = json.dumps(payload).encode('utf-8')
+                etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+                if status == 200 and self.headers.get('If-None-Match') == etag:
+                    stub._count('not_modified')
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                headers = {'ETag': etag} if status == 200 else {}
+                headers.update(extra_headers or {})
+                self.send_body(status, body, 'application/json', headers)
+
+            def do_GET(self):
+                stub._count('requests')
+                stub._delay()
+                path = self.path.split('?', 1)[0]
+
+                image = IMAGE_PATTERN.match(path)
+                if image:
+                    stub._count('images')
+                    self.send_body(200, stub.image(int(image.group(1)), int(image.group(2))), 'image/png')
+                    return
+
+                if not path.startswith(API_PREFIX):
+                    self.send_json(404, {'success': False, 'errors': ['Not found']})
+                    return
+                if not self.headers.get('Authorization', '').startswith('Bearer '):
+                    self.send_json(401, {'success': False, 'errors': ['Unauthorized']})
+                    return
+                if stub._should_fail():
+                    stub._count('errors')
+                    if stub.rng.random() < 0.5:
+                        self.send_json(429, {'success': False, 'errors': ['Too many requests']}, {'Retry-After': '1'})
+                    else:
+                        self.send_json(503, {'success': False, 'errors': ['Service unavailable']})
+                    return
+
+                route = path[len(API_PREFIX):]
+                if route.startswith('search/autocomplete/'):
+                    term = unquote(route[len('search/autocomplete/'):])
+                    self.send_json(200, {'success': True, 'data': stub.search(term)})
+                    return
+                listing = LISTING_PATTERN.match(route)
+                if listing:
+                    host = self.headers.get('Host') or '%s:%d' % self.server.server_address[:2]
+                    data = stub.listing(listing.group(1), int(listing.group(2)), host)
+                    self.send_json(200, {'success': True, 'data': data})
+                    return
+                self.send_json(404, {'success': False, 'errors': ['Not found']})
+
+            do_HEAD = do_GET
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Local SteamGridDB stand-in server')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds each response is delayed')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra delay in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API requests failing with 503/429')
+    parser.add_argument('--image-bytes', type=int, default=16384, help='Approximate size of served images')
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.latency, args.jitter, args.error_rate, args.image_bytes)
+    print(f"SteamGridDB stub listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Served {server.stats['requests']} requests, {server.stats['errors']} errors", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,10 @@
 
 import sys
 import os
+import json
 import logging
 from umu_launcher.app import UmuRunLauncher
+from umu_launcher.launch_plan import LaunchPlanError
 from steamgrid_api import SteamGridDB
 import argparse
 
@@ -40,6 +42,10 @@ if __name__ == "__main__":
     # Parse our custom arguments first
     parser = argparse.ArgumentParser(description='UMU Game Launcher')
     parser.add_argument('--launch', help='Launch a specific game by path')
+    parser.add_argument('--dry-run', action='store_true',
+                      help='With --launch, print the launch command and environment instead of launching')
+    parser.add_argument('--steamgrid-url',
+                      help='SteamGridDB API base URL (e.g. a local benchmarks/steamgrid_stub.py)')
     parser.add_argument('-v', '--verbose', action='store_true',
                       help='Enable verbose logging')
     parser.add_argument('-q', '--quiet', action='store_true',
@@ -67,9 +73,21 @@ if __name__ == "__main__":
     logger = logging.getLogger('umu-launcher')
     logger.setLevel(log_level)
     
+    if args.steamgrid_url:
+        # Read by every SteamGridDB client that has no URL configured
+        os.environ[SteamGridDB.BASE_URL_ENV] = args.steamgrid_url
+    
     app = UmuRunLauncher()
     
-    if args.launch:
+    if args.launch and args.dry_run:
+        # Show what would be launched
+        try:
+            print(json.dumps(app.dry_run(args.launch), indent=4))
+        except LaunchPlanError as e:
+            logger.error("Cannot launch %s: %s", args.launch, e)
+            sys.exit(1)
+        sys.exit(0)
+    elif args.launch:
         # Launch specific game
         app.launch_game(args.launch)
     else:
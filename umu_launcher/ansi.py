@@ -0,0 +1,207 @@
+import re
+
+# ANSI color code to GTK color mapping
+ANSI_COLORS = {
+    '30': '#000000',  # Black
+    '31': '#C62828',  # Red
+    '32': '#2E7D32',  # Green
+    '33': '#F57C00',  # Yellow
+    '34': '#1976D2',  # Blue
+    '35': '#7B1FA2',  # Magenta
+    '36': '#0097A7',  # Cyan
+    '37': '#757575',  # White
+    '90': '#616161',  # Bright Black (Gray)
+    '91': '#EF5350',  # Bright Red
+    '92': '#4CAF50',  # Bright Green
+    '93': '#FFA726',  # Bright Yellow
+    '94': '#42A5F5',  # Bright Blue
+    '95': '#AB47BC',  # Bright Magenta
+    '96': '#26C6DA',  # Bright Cyan
+    '97': '#FFFFFF',  # Bright White
+}
+
+# Control characters that are dropped from log text: everything below
+# space except tab, newline, carriage return, and BEL and ESC which are
+# needed to find the end of escape sequences (removed by parse_ansi)
+CONTROL_CHARS = dict.fromkeys(c for c in range(32) if c not in (7, 9, 10, 13, 27))
+
+# Escape sequences: CSI (ESC [ params intermediates final), OSC (ESC ] ...
+# terminated by BEL or ST) and two-character escapes
+ESCAPE_PATTERN = re.compile(
+    r'\x1b(?:\[([0-?]*)[ -/]*([@-~])|\][^\x07\x1b]*(?:\x07|\x1b\\)?|[@-_]?)'
+)
+
+# Timestamp already present at the start of a line, e.g. "[12:34:56] "
+TIMESTAMP_PATTERN = re.compile(r'\[\d{2}:\d{2}:\d{2}\]\s*')
+
+def strip_control(text):
+    """Remove control characters that can't be displayed, keeping BEL and ESC"""
+    return text.translate(CONTROL_CHARS)
+
+# The 16 base colors in palette order (indexes 0-15 of 256-color mode)
+BASE_PALETTE = [ANSI_COLORS[code] for code in (
+    '30', '31', '32', '33', '34', '35', '36', '37',
+    '90', '91', '92', '93', '94', '95', '96', '97'
+)]
+
+# Levels of the 6x6x6 color cube in 256-color mode
+CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+# Style of unstyled text: (foreground, background, bold, italic, underline)
+DEFAULT_STYLE = (None, None, False, False, False)
+
+def color_256(index):
+    """Map a 256-color palette index to a #rrggbb color"""
+    if index < 16:
+        return BASE_PALETTE[index]
+    if index < 232:
+        index -= 16
+        r, g, b = CUBE_LEVELS[index // 36], CUBE_LEVELS[index // 6 % 6], CUBE_LEVELS[index % 6]
+        return f'#{r:02X}{g:02X}{b:02X}'
+    level = 8 + (index - 232) * 10
+    return f'#{level:02X}{level:02X}{level:02X}'
+
+def _extended_color(params):
+    """
+    Decode the arguments of SGR 38/48
+
+    Args:
+        params: Parameters following 38/48 (5;n or 2;r;g;b)
+
+    Returns:
+        tuple: (#rrggbb color or None, number of parameters consumed)
+    """
+    if not params:
+        return None, 0
+    if params[0] == 5 and len(params) >= 2:
+        return (color_256(params[1]) if params[1] < 256 else None), 2
+    if params[0] == 2 and len(params) >= 4:
+        r, g, b = params[1:4]
+        if max(r, g, b) > 255:
+            return None, 4
+        return f'#{r:02X}{g:02X}{b:02X}', 4
+    return None, len(params)
+
+def _sgr_params(group):
+    """
+    Split SGR parameters into a flat list and colon sub-parameter groups
+
+    "1;38;5;196" gives [1, 38, 5, 196]; "38:2::255:0:0" gives one group
+    [38, 2, 255, 0, 0] (the optional color space id is skipped).
+    """
+    params = []
+    for part in group.split(';'):
+        if ':' in part:
+            sub = [int(p) if p.isdigit() else 0 for p in part.split(':')]
+            # 38:2:<colorspace>:r:g:b
+            if len(sub) == 6 and sub[1] == 2:
+                del sub[2]
+            params.append(sub)
+        else:
+            params.append(int(part) if part.isdigit() else 0)
+    return params
+
+def apply_sgr(style, group):
+    """
+    Apply one SGR sequence to a style
+
+    Args:
+        style: Current style tuple
+        group: Parameter string of the sequence (between ESC [ and m)
+
+    Returns:
+        tuple: New style
+    """
+    fg, bg, bold, italic, underline = style
+    params = _sgr_params(group)
+    i = 0
+    while i < len(params):
+        code = params[i]
+        i += 1
+        if isinstance(code, list):
+            # Colon form carries its own arguments
+            if code[0] in (38, 48):
+                color, _ = _extended_color(code[1:])
+                if code[0] == 38:
+                    fg = color
+                else:
+                    bg = color
+            elif code[0] == 4:
+                underline = len(code) < 2 or code[1] != 0
+            continue
+
+        if code == 0:
+            fg, bg, bold, italic, underline = DEFAULT_STYLE
+        elif code == 1:
+            bold = True
+        elif code == 3:
+            italic = True
+        elif code == 4:
+            underline = True
+        elif code == 22:
+            bold = False
+        elif code == 23:
+            italic = False
+        elif code == 24:
+            underline = False
+        elif 30 <= code <= 37:
+            fg = BASE_PALETTE[code - 30]
+        elif 90 <= code <= 97:
+            fg = BASE_PALETTE[code - 90 + 8]
+        elif 40 <= code <= 47:
+            bg = BASE_PALETTE[code - 40]
+        elif 100 <= code <= 107:
+            bg = BASE_PALETTE[code - 100 + 8]
+        elif code == 39:
+            fg = None
+        elif code == 49:
+            bg = None
+        elif code in (38, 48):
+            args = [p for p in params[i:i + 4] if not isinstance(p, list)]
+            color, used = _extended_color(args)
+            i += used
+            if code == 38:
+                fg = color
+            else:
+                bg = color
+    return fg, bg, bold, italic, underline
+
+def parse_ansi(text):
+    """
+    Split text on ANSI escape sequences and track SGR styling
+
+    Lines without an ESC byte are returned as a single unstyled segment
+    without running the tokenizer. Escape sequences other than SGR are
+    dropped from the text.
+
+    Args:
+        text: Text to parse
+
+    Returns:
+        list: (text, style) tuples, style being None for unstyled text or
+              a (foreground, background, bold, italic, underline) tuple
+    """
+    if '\x1b' not in text:
+        if '\x07' in text:
+            text = text.replace('\x07', '')
+        return [(text, None)]
+
+    result = []
+    style = DEFAULT_STYLE
+    last_end = 0
+    for match in ESCAPE_PATTERN.finditer(text):
+        # Add any text before the escape sequence
+        if match.start() > last_end:
+            segment = text[last_end:match.start()].replace('\x07', '')
+            result.append((segment, None if style == DEFAULT_STYLE else style))
+        last_end = match.end()
+
+        # Only SGR (ESC [ ... m) affects styling
+        if match.group(2) == 'm':
+            style = apply_sgr(style, match.group(1))
+
+    # Add any remaining text
+    if last_end < len(text):
+        segment = text[last_end:].replace('\x07', '')
+        result.append((segment, None if style == DEFAULT_STYLE else style))
+    return result
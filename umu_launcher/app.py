@@ -13,6 +13,7 @@ from .config_window import ConfigWindow
 from .game_list import GameList
 from .utils import is_windows_executable
 from .log_window import LogWindow
+from .launch_plan import LaunchPlanner, merge_game_flags
 
 logger = logging.getLogger('umu-launcher')
 
@@ -43,10 +44,36 @@ class UmuRunLauncher(Gtk.Application):
                 'wineprefix': os.path.expanduser('~/.wine').strip(),  # Default WINEPREFIX
                 'protonpath': os.path.expanduser('~/.local/share/Steam/compatibilitytools.d/UMU-Latest').strip(),  # Default PROTONPATH
                 'store': 'egs',  # Default store (egs for Epic Games Store)
-                'gameid': 'umu-dauntless'  # Default GAMEID for umu-run
+                'gameid': 'umu-dauntless',  # Default GAMEID for umu-run
+                'prewarm_wineserver': False  # Start the prefix's wineserver ahead of launch
             },
+            'umu_run_command': 'umu-run',  # Command used to run games
             'steamgriddb_api_key': '',  # API key should be set by user
-            'is_grid_view': False  # Default to list view
+            'steamgrid_base_url': '',  # SteamGridDB API URL override (empty for the public API)
+            'is_grid_view': False,  # Default to list view
+            'sort_recently_played': False,  # Show the most recently played games first
+            'max_concurrent_launches': 2,  # Launches in flight across all prefixes
+            'max_concurrent_bootstraps': 1,  # Launches creating a new prefix
+            'prewarm_timeout': 300,  # Seconds a pre-warmed wineserver stays up while idle
+            'log_max_lines': 5000,  # Lines kept in the log window
+            'log_max_chars': 4000000,  # Characters kept in the log window
+            'log_to_file': True,  # Save each session's output under ~/.local/state/umu-launcher/logs
+            'log_retention_count': 20,  # Session logs kept per game
+            'log_retention_bytes': 200 * 1024 * 1024,  # Total size of all session logs
+            'log_compression': 'gzip',  # Compression of finished session logs (gzip, xz or none)
+            'log_dedup': True,  # Collapse repeated lines in the log window
+            'log_channel_rate': 100,  # Lines per second shown per Wine debug channel (0 for no limit)
+            'log_channel_burst': 500,  # Lines a Wine debug channel may show at once
+            'log_queue_max': 10000,  # Lines waiting for the log window before new ones are dropped
+            'steamgrid_cache_ttl': 86400,  # Seconds SteamGridDB searches are reused before revalidating
+            'steamgrid_cache_bytes': 20 * 1024 * 1024,  # Size of the SteamGridDB response cache
+            'steamgrid_rate': 10,  # SteamGridDB requests per second across the launcher (0 for no limit)
+            'steamgrid_max_retries': 3,  # Retries of rate limited or failed SteamGridDB requests
+            'artwork_cache_bytes': 200 * 1024 * 1024,  # Size of downloaded artwork not used by any game
+            'artwork_max_download_bytes': 10 * 1024 * 1024,  # Largest artwork file downloaded
+            'artwork_keep_original': False,  # Keep artwork as downloaded next to its resized copies
+            'artwork_fetch_rate': 4,  # SteamGridDB requests per second when fetching missing artwork
+            'artwork_fetch_workers': 4  # Games searched in parallel when fetching missing artwork
         }
         
         # Load config and setup monitor
@@ -130,6 +157,16 @@ class UmuRunLauncher(Gtk.Application):
         action.connect("activate", self.on_toggle_layout)
         self.add_action(action)
         
+        action = Gio.SimpleAction.new_stateful(
+            "sort_recent", None, GLib.Variant.new_boolean(self.config.get('sort_recently_played', False))
+        )
+        action.connect("change-state", self.on_sort_recent_changed)
+        self.add_action(action)
+        
+        action = Gio.SimpleAction.new("fetch_artwork", None)
+        action.connect("activate", lambda *_: self.game_list and self.game_list.fetch_missing_artwork())
+        self.add_action(action)
+        
         action = Gio.SimpleAction.new("about", None)
         action.connect("activate", self.on_about_clicked)
         self.add_action(action)
@@ -224,9 +261,11 @@ class UmuRunLauncher(Gtk.Application):
         menu_button = Gtk.MenuButton()
         menu_button.set_icon_name("open-menu-symbolic")
         
-        # Create menu model with only About option
+        # Create menu model
         menu = Gio.Menu()
         section = Gio.Menu()
+        section.append("Sort by Recently Played", "app.sort_recent")
+        section.append("Fetch Missing Artwork", "app.fetch_artwork")
         section.append("About", "app.about")
         menu.append_section(None, section)
         
@@ -306,10 +345,10 @@ class UmuRunLauncher(Gtk.Application):
                         for key, value in loaded_config['flags'].items():
                             if key in self.config['flags']:
                                 self.config['flags'][key] = value
-                    if 'steamgriddb_api_key' in loaded_config:
-                        self.config['steamgriddb_api_key'] = loaded_config['steamgriddb_api_key']
-                    if 'is_grid_view' in loaded_config:
-                        self.config['is_grid_view'] = loaded_config['is_grid_view']
+                    # Top-level settings (API key, view mode, launch limits, ...)
+                    for key in self.config:
+                        if key not in ('games', 'flags') and key in loaded_config:
+                            self.config[key] = loaded_config[key]
             
             # Save config to ensure it exists and has all default values
             self.save_config()
@@ -339,6 +378,10 @@ class UmuRunLauncher(Gtk.Application):
             # Save config with pretty formatting
             with open(config_file, 'w') as f:
                 json.dump(self.config, f, indent=4)
+            
+            # Icons of removed games may be evicted, the new ones must not
+            if self.game_list:
+                self.game_list.icon_manager.sync_references(self.config.get('games', []))
                 
             logger.debug("Configuration saved successfully")
             
@@ -380,6 +423,20 @@ class UmuRunLauncher(Gtk.Application):
             logger.error("Game not found in configuration: %s", game_path)
             return 1
 
+    def dry_run(self, game_path):
+        """
+        Build the launch plan of a game without launching it
+        
+        Returns:
+            dict: argv, env, cwd, wineprefix and protonpath of the launch
+        
+        Raises:
+            LaunchPlanError: If the game cannot be launched as configured
+        """
+        game_path = os.path.abspath(os.path.expanduser(game_path))
+        planner = LaunchPlanner(self.config.get('umu_run_command', 'umu-run'))
+        return planner.plan(game_path, merge_game_flags(self.config, game_path)).to_dict()
+
     def on_add_game_clicked(self, button):
         dialog = Gtk.FileChooserDialog(
             title="Select Game Executable",
@@ -645,7 +702,10 @@ class UmuRunLauncher(Gtk.Application):
                 parent=self.window,
                 width=800,
                 height=400,
-                position='right'
+                position='right',
+                max_lines=self.config.get('log_max_lines', 5000),
+                max_chars=self.config.get('log_max_chars', 4000000),
+                max_pending=self.config.get('log_queue_max', 10000)
             )
             self.shared_log_window.title_label.set_text("Application Log")
             
@@ -681,6 +741,12 @@ class UmuRunLauncher(Gtk.Application):
                 button.set_icon_name("view-grid-symbolic")
                 button.set_tooltip_text("Switch to Grid View")
 
+    def on_sort_recent_changed(self, action, value):
+        """Switch between the configured order and most recently played first"""
+        action.set_state(value)
+        if self.game_list:
+            self.game_list.set_sort_recent(value.get_boolean())
+
     def on_toggle_layout(self, action, param):
         """Toggle between vertical and horizontal layout"""
         if hasattr(self, 'game_list'):
@@ -700,6 +766,14 @@ class UmuRunLauncher(Gtk.Application):
         
         dialog.present()
 
+    def do_shutdown(self):
+        # An interrupted artwork run resumes on the next start
+        if self.game_list:
+            self.game_list.artwork_fetcher.cancel()
+            # Games outlive the launcher, count their playtime up to now
+            self.game_list.end_open_sessions()
+        Gtk.Application.do_shutdown(self)
+
     def on_quit(self, action, param):
         """Quit the application"""
         self.quit()
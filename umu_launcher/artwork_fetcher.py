@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from .steamgrid_api import CancelToken, CircuitOpen, RequestCancelled
+from .utils import TokenBucket
+
+logger = logging.getLogger('umu-launcher')
+
+def is_outage(error):
+    """True for failures that say nothing about the artwork: network and server errors"""
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    response = getattr(error, 'response', None)
+    return response is not None and (response.status_code >= 500 or response.status_code == 429)
+
+class ArtworkFetcher:
+    """
+    Finds icons for a whole library in the background
+
+    Each game is searched on SteamGridDB and its first icon that
+    downloads is put in the artwork store. Games are worked on in
+    parallel, with all requests sharing one rate limit. Progress is saved
+    to a state file after every game, so a run interrupted by closing the
+    launcher picks up where it stopped with resume(). A run also stops,
+    keeping its state, when SteamGridDB can't be reached, so games aren't
+    given up on during an outage.
+    """
+
+    # Icons tried per game before giving up
+    MAX_CANDIDATES = 3
+
+    def __init__(self, client, store, state_path=None, rate=4, burst=4, max_workers=4, max_download_bytes=None):
+        """
+        Args:
+            client: SteamGridDB client
+            store: ArtworkStore the icons are downloaded into
+            state_path: File of the run's progress (default: ~/.local/state/umu-launcher/artwork_fetch.json)
+            rate: Requests per second across all workers (0 for no limit)
+            burst: Requests that may be made at once before the rate applies
+            max_workers: Games worked on in parallel
+            max_download_bytes: Largest icon file downloaded
+        """
+        if state_path is None:
+            state_path = os.path.expanduser('~/.local/state/umu-launcher/artwork_fetch.json')
+        self.client = client
+        self.store = store
+        self.state_path = state_path
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_workers = max_workers
+        self.max_download_bytes = max_download_bytes
+        self.cancel_token = None
+        self._lock = threading.Lock()
+        self._state = None
+        self._executor = None
+
+    @property
+    def running(self):
+        return self.cancel_token is not None and not self.cancel_token.cancelled
+
+    def pending_run(self):
+        """
+        Get the games left over from an interrupted run
+
+        Returns:
+            dict: Saved state with 'queue' (game paths and names) and 'results', or None
+        """
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if state.get('queue'):
+                return state
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.error(f"Error reading artwork fetch state: {e}")
+        return None
+
+    def start(self, games, on_icon, on_done=None):
+        """
+        Start fetching icons
+
+        Args:
+            games: List of (game path, game name) to find icons for
+            on_icon: Called with the game path and icon path as icons arrive (from a worker thread)
+            on_done: Called with the number of icons found and of games tried when the run ends
+
+        Returns:
+            bool: False if a run is already in progress
+        """
+        state = {'started_at': time.time(), 'queue': [list(game) for game in games], 'results': {}}
+        return self._run(state, on_icon, on_done)
+
+    def resume(self, on_icon, on_done=None):
+        """
+        Continue an interrupted run
+
+        Icons found before the interruption are reported to on_icon again,
+        since the launcher may have exited before saving them.
+
+        Returns:
+            bool: False if there was nothing to resume or a run is in progress
+        """
+        state = self.pending_run()
+        if state is None:
+            return False
+        return self._run(state, on_icon, on_done, replay=True)
+
+    def _run(self, state, on_icon, on_done, replay=False):
+        with self._lock:
+            if self.running:
+                return False
+            self._state = state
+            self.cancel_token = cancel = CancelToken()
+            self._save_state()
+            queue = list(state['queue'])
+            results = dict(state['results'])
+
+        if replay:
+            for game_path, icon_path in results.items():
+                if icon_path and os.path.exists(icon_path):
+                    self._notify(on_icon, game_path, icon_path)
+
+        if not queue:
+            self._finish(cancel, on_done)
+            return True
+
+        remaining = [len(queue)]
+        self._executor = executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='artwork')
+
+        def game_done(game_path, icon_path):
+            if icon_path:
+                # Keep later downloads of the run from evicting it
+                try:
+                    self.store.add_reference(game_path, icon_path)
+                except Exception as e:
+                    logger.error(f"Error updating artwork references: {e}")
+            with self._lock:
+                if cancel.cancelled:
+                    return
+                self._state['queue'] = [game for game in self._state['queue'] if game[0] != game_path]
+                self._state['results'][game_path] = icon_path
+                self._save_state()
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if icon_path:
+                self._notify(on_icon, game_path, icon_path)
+            if finished:
+                self._finish(cancel, on_done)
+
+        def work(game_path, game_name):
+            try:
+                try:
+                    icon_path = self._fetch_game(game_name, cancel)
+                except CircuitOpen as e:
+                    # SteamGridDB is paused after failing, wait for it once
+                    # instead of running through the library
+                    cancel.sleep(max(1.0, e.retry_in))
+                    icon_path = self._fetch_game(game_name, cancel)
+            except RequestCancelled:
+                return
+            except Exception as e:
+                if is_outage(e):
+                    # Not an answer about this game, leave it queued for resume()
+                    self._interrupt(cancel, on_done, e)
+                    return
+                # Rejected or malformed answers would fail the same way next time
+                logger.error(f"Error fetching artwork for {game_name}: {e}")
+                icon_path = None
+            game_done(game_path, icon_path)
+
+        for game_path, game_name in queue:
+            executor.submit(work, game_path, game_name)
+        executor.shutdown(wait=False)
+        return True
+
+    def _fetch_game(self, game_name, cancel):
+        """
+        Find and download the icon of one game (blocking)
+
+        Returns:
+            str: Path of the icon, or None if the game has no usable icon
+
+        Raises:
+            RequestException: The search or listing failed, or SteamGridDB is unreachable
+                (see is_outage())
+        """
+        self._throttle(cancel)
+        games = self.client.search_games(game_name, cancel)
+        if not games:
+            return None
+        self._throttle(cancel)
+        icons = self.client.get_icons(games[0]['id'], cancel)
+        for icon in icons[:self.MAX_CANDIDATES]:
+            url = icon.get('url')
+            if not url:
+                continue
+            icon_path = self.store.lookup(url)
+            if icon_path:
+                return icon_path
+            self._throttle(cancel)
+            try:
+                return self.store.download(self.client, url, self.max_download_bytes, cancel)
+            except RequestCancelled:
+                raise
+            except Exception as e:
+                if is_outage(e):
+                    raise
+                logger.warning(f"Skipping icon of {game_name}: {e}")
+        return None
+
+    def _throttle(self, cancel):
+        """Wait for the rate limit, giving up if the run is cancelled"""
+        if self.bucket:
+            while not self.bucket.acquire(timeout=0.5):
+                cancel.check()
+        cancel.check()
+
+    def _notify(self, callback, *args):
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Error handling fetched artwork: {e}")
+
+    def _interrupt(self, cancel, on_done, error):
+        """Stop a run SteamGridDB failed during, keeping its state for resume()"""
+        with self._lock:
+            if cancel.cancelled:
+                return
+            results = self._state['results']
+            found = sum(1 for icon_path in results.values() if icon_path)
+            tried = len(results)
+            left = len(self._state['queue'])
+        logger.warning(f"Stopped fetching artwork, {left} games left for later: {error}")
+        self.cancel()
+        if on_done:
+            self._notify(on_done, found, tried)
+
+    def _finish(self, cancel, on_done):
+        with self._lock:
+            if cancel.cancelled:
+                return
+            results = self._state['results']
+            found = sum(1 for icon_path in results.values() if icon_path)
+            tried = len(results)
+            self.cancel_token = None
+            self._state = None
+            try:
+                os.remove(self.state_path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Error removing artwork fetch state: {e}")
+        if on_done:
+            self._notify(on_done, found, tried)
+
+    def _save_state(self):
+        """Write the run's progress atomically (lock held)"""
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._state, f)
+            os.replace(tmp_path, self.state_path)
+        except Exception as e:
+            logger.error(f"Error saving artwork fetch state: {e}")
+
+    def cancel(self):
+        """
+        Stop the run, keeping its state so it can be resumed
+
+        Requests in flight finish in the background, their results are dropped.
+        """
+        with self._lock:
+            if self.cancel_token:
+                self.cancel_token.cancel()
+            self.cancel_token = None
+            self._state = None
+            if self._executor:
+                try:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                except TypeError:
+                    # Python 3.8 can't cancel queued futures
+                    self._executor.shutdown(wait=False)
+                self._executor = None
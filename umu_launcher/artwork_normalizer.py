@@ -0,0 +1,72 @@
+import os
+import tempfile
+import gi
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import GdkPixbuf
+
+# Sizes artwork is shown at: search results, list view, grid view
+ICON_SIZES = (32, 64, 96)
+
+class ArtworkNormalizer:
+    """
+    Turns downloaded artwork into small PNGs in the sizes the UI shows
+
+    The image is decoded once, scaled down (never up) to fit each size
+    and saved as a compressed PNG. Only the pixels are written, so
+    metadata chunks of the original are dropped.
+    """
+
+    def __init__(self, sizes=ICON_SIZES, compression=9):
+        """
+        Args:
+            sizes: Widths and heights to create variants for
+            compression: zlib level of the PNG files
+        """
+        self.sizes = tuple(sorted(sizes))
+        self.compression = compression
+
+    def __call__(self, src_path, dest_prefix):
+        """
+        Create the variants of an image
+
+        Args:
+            src_path: Image to normalize
+            dest_prefix: Path the variants are named after ("<prefix>-<size>.png")
+
+        Returns:
+            dict: Path of the variant of each size
+        """
+        largest = self.sizes[-1]
+        info = GdkPixbuf.Pixbuf.get_file_info(src_path)
+        if info is None or info[0] is None:
+            raise ValueError(f"Unsupported image format: {src_path}")
+        _, width, height = info
+        if width > largest or height > largest:
+            # Let the loader scale while decoding instead of holding the full image
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(src_path, largest, largest, True)
+        else:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(src_path)
+
+        variants = {}
+        for size in self.sizes:
+            scale = min(size / pixbuf.get_width(), size / pixbuf.get_height())
+            if scale < 1:
+                scaled = pixbuf.scale_simple(
+                    max(1, round(pixbuf.get_width() * scale)),
+                    max(1, round(pixbuf.get_height() * scale)),
+                    GdkPixbuf.InterpType.HYPER
+                )
+            else:
+                scaled = pixbuf
+            path = f"{dest_prefix}-{size}.png"
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.png.tmp')
+            os.close(fd)
+            try:
+                scaled.savev(tmp_path, 'png', ['compression'], [str(self.compression)])
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            variants[size] = path
+        return variants
@@ -0,0 +1,493 @@
+import os
+import time
+import sqlite3
+import shutil
+import hashlib
+import tempfile
+import threading
+import logging
+from .utils import image_mime_type
+
+logger = logging.getLogger('umu-launcher')
+
+# File extension of each artwork MIME type
+EXTENSIONS = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+    'image/x-icon': '.ico',
+    'image/vnd.microsoft.icon': '.ico',
+}
+
+def digest_of(path):
+    """Content digest of a stored file or one of its variants"""
+    return os.path.basename(path)[:64]
+
+def url_key(url):
+    """Stable key of an artwork URL (unlike hash(), the same in every run)"""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+class ArtworkStore:
+    """
+    Content-addressed store of downloaded artwork
+
+    Files are named by the SHA-256 digest of their content, so the same
+    image fetched from different URLs is stored once. A SQLite index maps
+    the stable digest of each URL to its content and tracks when every
+    file was last used. The store is kept under max_bytes by evicting the
+    least recently used files, except files referenced by a game (its
+    selected icon), which are never evicted.
+
+    With a normalizer, every file is also stored as small variants in the
+    sizes the UI shows, and the original is dropped unless keep_original
+    is set.
+    """
+
+    # Failed normalizations of a file before normalize_pending() stops retrying it
+    MAX_NORMALIZE_ATTEMPTS = 3
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blobs (
+            digest TEXT PRIMARY KEY,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_blobs_accessed
+            ON blobs (accessed_at);
+
+        CREATE TABLE IF NOT EXISTS urls (
+            url_key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            digest TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_urls_digest
+            ON urls (digest);
+
+        CREATE TABLE IF NOT EXISTS refs (
+            owner TEXT PRIMARY KEY,
+            digest TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_refs_digest
+            ON refs (digest);
+
+        CREATE TABLE IF NOT EXISTS variants (
+            digest TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            PRIMARY KEY (digest, size)
+        );
+
+        CREATE TABLE IF NOT EXISTS normalize_failures (
+            digest TEXT PRIMARY KEY,
+            attempts INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, root=None, max_bytes=200 * 1024 * 1024, normalizer=None, keep_original=True):
+        """
+        Open (and create if needed) the artwork store
+
+        Args:
+            root: Directory of the store (default: ~/.cache/umu-launcher/artwork)
+            max_bytes: Size budget of the store (referenced files are kept even over it)
+            normalizer: Called with a file and the path prefix of its variants, returns {size: variant path}
+            keep_original: Keep files as downloaded next to their variants
+        """
+        if root is None:
+            root = os.path.expanduser('~/.cache/umu-launcher/artwork')
+        self.root = root
+        self.max_bytes = max_bytes
+        self.normalizer = normalizer
+        self.keep_original = keep_original
+        self.tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._remove_stale_downloads()
+
+        # Downloads finish on worker threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        # Digests being normalized, and a condition to wait for them
+        self._normalizing = set()
+        self._normalized = threading.Condition(self._lock)
+        self._conn = sqlite3.connect(os.path.join(self.root, 'index.sqlite3'), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def _remove_stale_downloads(self, max_age=3600):
+        """Remove temporary files left behind by interrupted downloads"""
+        now = time.time()
+        for entry in os.scandir(self.tmp_dir):
+            try:
+                if now - entry.stat().st_mtime > max_age:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _path(self, filename):
+        return os.path.join(self.root, filename[:2], filename)
+
+    def contains(self, path):
+        """True if path is a file inside the store"""
+        if not path:
+            return False
+        return os.path.dirname(os.path.dirname(os.path.abspath(path))) == os.path.abspath(self.root)
+
+    def lookup(self, url):
+        """
+        Get the stored file of an artwork URL
+
+        Args:
+            url: URL the artwork was downloaded from
+
+        Returns:
+            str: Path of the file, or None if it isn't stored
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                """
+                SELECT blobs.digest, blobs.filename FROM urls
+                JOIN blobs ON blobs.digest = urls.digest
+                WHERE urls.url_key = ?
+                """,
+                (url_key(url),)
+            ).fetchone()
+            if row is None:
+                return None
+            path = self._path(row['filename'])
+            if not os.path.exists(path):
+                # Removed behind our back
+                self._forget(row['digest'])
+                return None
+            self._conn.execute(
+                "UPDATE blobs SET accessed_at = ? WHERE digest = ?",
+                (time.time(), row['digest'])
+            )
+        return path
+
+    def temp_file(self):
+        """
+        Create a temporary file on the store's filesystem for a download
+
+        Returns:
+            tuple: (file object opened for binary writing, path)
+        """
+        fd, path = tempfile.mkstemp(dir=self.tmp_dir, suffix='.part')
+        return os.fdopen(fd, 'wb'), path
+
+    def put_file(self, url, tmp_path, mime_type='image/png', digest=None):
+        """
+        Move a downloaded temporary file into the store
+
+        Args:
+            url: URL the artwork was downloaded from
+            tmp_path: File from temp_file(), moved into place atomically
+            mime_type: MIME type of the content, picks the file extension
+            digest: SHA-256 hex digest of the content if already computed
+
+        Returns:
+            str: Path of the stored file
+        """
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b''):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+        size = os.path.getsize(tmp_path)
+
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT filename FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            filename = row['filename'] if row else digest + EXTENSIONS.get(mime_type, '.png')
+            normalized = row is not None and self._has_variants(digest)
+            path = self._path(filename)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if os.path.exists(path):
+                # Same content already stored
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, path)
+            now = time.time()
+            self._conn.execute(
+                """
+                INSERT INTO blobs (digest, filename, size, accessed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (digest) DO UPDATE SET accessed_at = excluded.accessed_at
+                """,
+                (digest, filename, size, now)
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO urls (url_key, url, digest) VALUES (?, ?, ?)",
+                (url_key(url), url, digest)
+            )
+            self._evict(keep=digest)
+        if self.normalizer and not normalized:
+            path = self.normalize(digest) or path
+        return path
+
+    def _has_variants(self, digest):
+        return self._conn.execute("SELECT 1 FROM variants WHERE digest = ?", (digest,)).fetchone() is not None
+
+    def normalize(self, digest):
+        """
+        Create the variants of a stored file
+
+        Runs on the calling thread, so call it from a worker thread.
+
+        Returns:
+            str: Path the file is now stored at (its largest variant if the
+                original was dropped), or None if it couldn't be normalized
+        """
+        with self._lock:
+            # Downloads and normalize_pending() may reach the same file, let one do the work
+            while digest in self._normalizing:
+                self._normalized.wait()
+            row = self._conn.execute("SELECT filename FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            if row is None:
+                return None
+            if self._has_variants(digest):
+                return self._path(row['filename'])
+            self._normalizing.add(digest)
+        try:
+            return self._create_variants(digest, row['filename'])
+        finally:
+            with self._lock:
+                self._normalizing.discard(digest)
+                self._normalized.notify_all()
+
+    def _create_variants(self, digest, filename):
+        """Run the normalizer on a stored file and record its variants"""
+        path = self._path(filename)
+        try:
+            variants = self.normalizer(path, self._path(digest))
+        except Exception as e:
+            logger.error(f"Error normalizing artwork {filename}: {e}")
+            self._normalize_failed(digest)
+            return None
+        if not variants:
+            self._normalize_failed(digest)
+            return None
+
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone() is None:
+                # Evicted in the meantime
+                for variant in variants.values():
+                    if os.path.exists(variant):
+                        os.remove(variant)
+                return None
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO variants (digest, size, filename) VALUES (?, ?, ?)",
+                [(digest, size, os.path.basename(variant)) for size, variant in variants.items()]
+            )
+            # Games may point at the original of files stored before normalization
+            referenced = self._conn.execute("SELECT 1 FROM refs WHERE digest = ?", (digest,)).fetchone()
+            if not self.keep_original and referenced is None:
+                largest = variants[max(variants)]
+                if os.path.abspath(largest) != os.path.abspath(path):
+                    os.remove(path)
+                path = largest
+                self._conn.execute(
+                    "UPDATE blobs SET filename = ? WHERE digest = ?",
+                    (os.path.basename(path), digest)
+                )
+            size = os.path.getsize(path) + sum(
+                os.path.getsize(variant) for variant in set(variants.values()) if variant != path
+            )
+            self._conn.execute("UPDATE blobs SET size = ? WHERE digest = ?", (size, digest))
+        return path
+
+    def _normalize_failed(self, digest):
+        """Count a failed normalization, so files that can't be decoded aren't retried forever"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO normalize_failures (digest, attempts) VALUES (?, 1)
+                ON CONFLICT (digest) DO UPDATE SET attempts = attempts + 1
+                """,
+                (digest,)
+            )
+
+    def normalize_pending(self):
+        """Create the variants of files stored before normalization was enabled"""
+        if not self.normalizer:
+            return
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT digest FROM blobs
+                WHERE digest NOT IN (SELECT digest FROM variants)
+                AND digest NOT IN (SELECT digest FROM normalize_failures WHERE attempts >= ?)
+                """,
+                (self.MAX_NORMALIZE_ATTEMPTS,)
+            ).fetchall()
+        for row in rows:
+            self.normalize(row['digest'])
+
+    def variant(self, path, size):
+        """
+        Get the smallest variant of a stored file that is at least size pixels
+
+        Args:
+            path: Stored file (or any file, returned as it is)
+            size: Width and height the image will be shown at
+
+        Returns:
+            str: Path of the variant, or path if there is none
+        """
+        if not self.contains(path):
+            return path
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT filename FROM variants WHERE digest = ?
+                ORDER BY size < ?, ABS(size - ?) LIMIT 1
+                """,
+                (digest_of(path), size, size)
+            ).fetchone()
+        if row is None:
+            return path
+        variant = self._path(row['filename'])
+        return variant if os.path.exists(variant) else path
+
+    def import_file(self, file_path):
+        """
+        Copy a local image (e.g. an icon shipped with a game) into the store
+
+        Returns:
+            str: Path of the stored file
+
+        Raises:
+            ValueError: The file isn't an image
+        """
+        mime_type = image_mime_type(file_path)
+        if mime_type is None:
+            raise ValueError(f"{file_path} is not an image")
+        f, tmp_path = self.temp_file()
+        try:
+            with f, open(file_path, 'rb') as src:
+                shutil.copyfileobj(src, f)
+            return self.put_file('file://' + os.path.abspath(file_path), tmp_path, mime_type)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def download(self, client, url, max_bytes=None, cancel=None):
+        """
+        Download artwork into the store
+
+        The response is streamed to a temporary file in the store, checked
+        against the size limit and for being an image, and only then moved
+        into place.
+
+        Args:
+            client: SteamGridDB client to download with
+            url: URL of the artwork
+            max_bytes: Largest file accepted (None for no limit)
+            cancel: CancelToken to cancel the download
+
+        Returns:
+            str: Path of the stored file
+
+        Raises:
+            ValueError: The file isn't an image
+        """
+        f, tmp_path = self.temp_file()
+        try:
+            with f:
+                content_type, digest = client.download_to(f, url, max_bytes, cancel)
+            mime_type = image_mime_type(tmp_path)
+            if mime_type is None:
+                raise ValueError(f"not an image (served as {content_type})")
+            return self.put_file(url, tmp_path, mime_type, digest)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def sync_references(self, icons):
+        """
+        Replace the references with the icons games currently use
+
+        Args:
+            icons: Mapping of game path to icon path; icons outside the store are ignored
+        """
+        refs = []
+        for owner, path in icons.items():
+            if self.contains(path):
+                refs.append((owner, digest_of(path)))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM refs")
+            self._conn.executemany("INSERT OR REPLACE INTO refs (owner, digest) VALUES (?, ?)", refs)
+
+    def add_reference(self, owner, path):
+        """
+        Keep one game's icon from being evicted, until the next sync_references()
+
+        Args:
+            owner: Game path
+            path: Icon path; icons outside the store are ignored
+        """
+        if not self.contains(path):
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO refs (owner, digest) VALUES (?, ?)",
+                (owner, digest_of(path))
+            )
+
+    def _forget(self, digest):
+        """Drop a file, its variants and its index rows (lock held)"""
+        filenames = [row['filename'] for row in self._conn.execute(
+            "SELECT filename FROM blobs WHERE digest = ? UNION SELECT filename FROM variants WHERE digest = ?",
+            (digest, digest)
+        )]
+        for filename in filenames:
+            try:
+                os.remove(self._path(filename))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Error removing cached artwork: {e}")
+        self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+        self._conn.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+        self._conn.execute("DELETE FROM variants WHERE digest = ?", (digest,))
+        self._conn.execute("DELETE FROM normalize_failures WHERE digest = ?", (digest,))
+
+    def _evict(self, keep=None):
+        """Remove least recently used unreferenced files until the store fits (lock held)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            """
+            SELECT digest, size FROM blobs
+            WHERE digest NOT IN (SELECT digest FROM refs)
+            ORDER BY accessed_at
+            """
+        ).fetchall()
+        for row in rows:
+            if total <= self.max_bytes:
+                break
+            if row['digest'] == keep or row['digest'] in self._normalizing:
+                continue
+            self._forget(row['digest'])
+            total -= row['size']
+
+    def size(self):
+        """Total size of the stored files in bytes"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def clear(self):
+        """Remove all files that no game references"""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT digest FROM blobs WHERE digest NOT IN (SELECT digest FROM refs)"
+            ).fetchall()
+            for row in rows:
+                self._forget(row['digest'])
+
+    def close(self):
+        """Close the index"""
+        with self._lock:
+            self._conn.close()
@@ -129,6 +129,15 @@ class ConfigWindow(Gtk.Dialog):
         )
         perf_group.append(mangohud_box)
         
+        # Wineserver pre-warming
+        prewarm_box = self.create_setting_item(
+            'prewarm_wineserver',
+            "Pre-warm Wineserver",
+            "Start the prefix's wineserver when a game is hovered or configured",
+            config
+        )
+        perf_group.append(prewarm_box)
+        
         main_box.append(perf_group)
         
         # Advanced group
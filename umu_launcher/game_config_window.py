@@ -4,6 +4,9 @@ gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, GLib, GdkPixbuf
 
 class GameConfigWindow(Gtk.Dialog):
+    # Milliseconds of no typing before the icon search starts
+    SEARCH_DEBOUNCE_MS = 400
+
     def __init__(self, parent, game, icon_manager, callback):
         super().__init__(
             title=f"Configure {game.name}",
@@ -20,6 +23,10 @@ class GameConfigWindow(Gtk.Dialog):
         # Get the app instance to access global settings
         self.app = parent.get_application()
         
+        # Opening the dialog usually precedes a launch, warm up the prefix
+        if self.app.game_list:
+            self.app.game_list.warm_prefix(game)
+        
         # Set window size
         self.set_default_size(500, -1)
         
@@ -292,7 +299,7 @@ class GameConfigWindow(Gtk.Dialog):
         self.icon_image.set_size_request(64, 64)
         if game.icon and os.path.exists(game.icon):
             try:
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(game.icon, 64, 64)
+                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(icon_manager.sized_icon(game.icon, 64), 64, 64)
                 self.icon_image.set_pixbuf(pixbuf)
             except Exception as e:
                 print(f"Error loading icon preview: {e}")
@@ -325,11 +332,22 @@ class GameConfigWindow(Gtk.Dialog):
         self.search_entry.add_css_class("entry")
         search_box.append(self.search_entry)
         
+        self.search_spinner = Gtk.Spinner()
+        self.search_spinner.set_visible(False)
+        search_box.append(self.search_spinner)
+        
         search_button = Gtk.Button(label="Search")
         search_button.add_css_class("button")
         search_button.connect('clicked', self.on_search_clicked)
         search_box.append(search_button)
         
+        # Search as the user types, and right away on Enter
+        self.search_cancel = None  # CancelToken of the search in flight
+        self.results_cancel = None  # CancelToken of the shown results' thumbnails
+        self.search_timeout_id = None
+        self.search_entry.connect('changed', self.on_search_changed)
+        self.search_entry.connect('activate', self.on_search_clicked)
+        
         icon_box.append(search_box)
         
         # Results list
@@ -378,7 +396,7 @@ class GameConfigWindow(Gtk.Dialog):
         # Store selected icon info
         self.selected_icon_info = None
         
-    def create_result_row(self, icon_info):
+    def create_result_row(self, icon_info, cancel=None):
         """Create a row for search results"""
         row = Gtk.ListBoxRow()
         
@@ -395,7 +413,7 @@ class GameConfigWindow(Gtk.Dialog):
         
         icon = Gtk.Picture()
         icon.set_size_request(32, 32)
-        self.icon_manager.get_icon(icon_info['name'], on_icon_loaded)
+        self.icon_manager.load_thumbnail_async(icon_info, on_icon_loaded, 32, cancel)
         box.append(icon)
         
         # Icon info
@@ -418,15 +436,44 @@ class GameConfigWindow(Gtk.Dialog):
         row.icon_info = icon_info
         return row
     
-    def on_search_clicked(self, button):
+    def on_search_clicked(self, widget):
         """Handle search button click"""
-        query = self.search_entry.get_text()
+        self.cancel_search_timeout()
+        self.start_search(self.search_entry.get_text().strip())
+    
+    def on_search_changed(self, entry):
+        """Search again once the user stops typing"""
+        self.cancel_search_timeout()
+        # Without an API key the search would only show the key dialog on every keystroke
+        if self.icon_manager.steamgrid and entry.get_text().strip():
+            self.search_timeout_id = GLib.timeout_add(self.SEARCH_DEBOUNCE_MS, self.on_search_timeout)
+    
+    def on_search_timeout(self):
+        self.search_timeout_id = None
+        self.start_search(self.search_entry.get_text().strip())
+        return False
+    
+    def cancel_search_timeout(self):
+        if self.search_timeout_id is not None:
+            GLib.source_remove(self.search_timeout_id)
+            self.search_timeout_id = None
+    
+    def cancel_search(self):
+        """Cancel the search in flight, its results are dropped"""
+        if self.search_cancel:
+            self.search_cancel.cancel()
+            self.search_cancel = None
+        self.search_spinner.stop()
+        self.search_spinner.set_visible(False)
+    
+    def start_search(self, query):
+        """Start a background icon search, replacing the one in flight"""
         if not query:
             return
-        
-        # Show loading state
-        self.search_entry.set_sensitive(False)
-        button.set_sensitive(False)
+        self.cancel_search()
+        if self.results_cancel:
+            self.results_cancel.cancel()
+            self.results_cancel = None
         
         # Clear previous results
         while True:
@@ -439,43 +486,53 @@ class GameConfigWindow(Gtk.Dialog):
         self.results_scroll.set_visible(False)
         
         def search_complete(icons):
+            if cancel is not None and cancel is not self.search_cancel:
+                return
+            self.search_cancel = None
+            self.results_cancel = cancel
+            self.search_spinner.stop()
+            self.search_spinner.set_visible(False)
+            
             # Show results area now that we have results
             if icons:
                 self.results_scroll.set_visible(True)
             
             # Add results
             for icon in icons:
-                row = self.create_result_row(icon)
+                row = self.create_result_row(icon, cancel)
                 self.results_list.append(row)
-            
-            # Reset UI state
-            self.search_entry.set_sensitive(True)
-            button.set_sensitive(True)
         
-        # Start search
-        self.icon_manager.search_icons(query, search_complete)
+        # Show loading state
+        self.search_spinner.set_visible(True)
+        self.search_spinner.start()
+        cancel = None  # The callback runs right away when no API key is set
+        cancel = self.icon_manager.search_icons_async(query, search_complete, self.get_root())
+        self.search_cancel = cancel
     
     def on_result_selected(self, list_box, row):
         """Handle search result selection"""
         if row:
             icon_info = row.icon_info
-            try:
-                # Download the icon using the game's set_icon method
-                if self.game.set_icon(icon_info['url']):
-                    # Update the icon preview
-                    try:
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(self.game.icon, 64, 64)
-                        if pixbuf:
-                            self.icon_image.set_pixbuf(pixbuf)
-                            # Store selected icon info
-                            self.selected_icon_info = {
-                                'source': 'download',
-                                'filename': self.game.icon
-                            }
-                    except Exception as e:
-                        print(f"Error loading icon preview: {e}")
-            except Exception as e:
-                print(f"Error downloading icon: {e}")
+            
+            def on_icon_fetched(icon_path):
+                # Ignore downloads of rows selected earlier
+                if not icon_path or self.results_list.get_selected_row() is not row:
+                    return
+                # Update the icon preview
+                try:
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(self.icon_manager.sized_icon(icon_path, 64), 64, 64)
+                    if pixbuf:
+                        self.icon_image.set_pixbuf(pixbuf)
+                        # Store selected icon info, the game's icon changes on Save
+                        self.selected_icon_info = {
+                            'source': 'download',
+                            'filename': icon_path
+                        }
+                except Exception as e:
+                    print(f"Error loading icon preview: {e}")
+            
+            # Usually already in the artwork store from the thumbnail
+            self.icon_manager.fetch_artwork_async(icon_info['url'], on_icon_fetched, self.results_cancel)
     
     def on_browse_clicked(self, button):
         """Handle browse button click"""
@@ -509,10 +566,18 @@ class GameConfigWindow(Gtk.Dialog):
                         if pixbuf:
                             self.icon_image.set_pixbuf(pixbuf)
                             # Store selected icon info
-                            self.selected_icon_info = {
+                            selected_icon_info = {
                                 'source': 'local',
                                 'filename': file_path
                             }
+                            self.selected_icon_info = selected_icon_info
+                            
+                            def on_icon_imported(icon_path):
+                                # Use the normalized copy unless another icon was picked meanwhile
+                                if icon_path and self.selected_icon_info is selected_icon_info:
+                                    selected_icon_info['filename'] = icon_path
+                            
+                            self.icon_manager.import_artwork_async(file_path, on_icon_imported)
                     except Exception as e:
                         print(f"Error loading selected icon: {e}")
         finally:
@@ -706,6 +771,8 @@ class GameConfigWindow(Gtk.Dialog):
             dialog.connect("response", lambda d, r: d.destroy())
             dialog.present()
         finally:
-            # Clear icon cache before closing
-            self.icon_manager.clear_cache()
+            self.cancel_search_timeout()
+            self.cancel_search()
+            if self.results_cancel:
+                self.results_cancel.cancel()
             dialog.destroy()
@@ -18,6 +18,7 @@ class GameInfo:
         self.name = name if name else self._get_name()
         self.icon = icon if icon else self._get_icon_path()
         self.process = None
+        self.session_id = None  # Play history session of the running process
         try:
             self._size = os.path.getsize(self.file_path)
         except OSError as e:
@@ -41,27 +42,6 @@ class GameInfo:
         except Exception:
             return None
         
-    def set_icon(self, icon_url):
-        """Download and set a new icon for the game"""
-        try:
-            import requests
-            game_dir = os.path.dirname(self.file_path)
-            icon_path = os.path.join(game_dir, "icon.png")
-            
-            # Download the icon
-            response = requests.get(icon_url)
-            response.raise_for_status()
-            
-            # Save the icon
-            with open(icon_path, 'wb') as f:
-                f.write(response.content)
-            
-            self.icon = icon_path
-            return True
-        except Exception as e:
-            print(f"Error setting icon: {e}")
-            return False
-        
     def _determine_type(self):
         """Determine the type of executable using python-magic"""
         try:
@@ -8,8 +8,18 @@ gi.require_version('Gdk', '4.0')
 from gi.repository import Gtk, GLib, Pango, GdkPixbuf, Gio, Gdk, GObject
 from pathlib import Path
 from .icon_manager import IconManager
+from .artwork_fetcher import ArtworkFetcher
+from .steamgrid_api import SteamGridDB
 from .log_window import LogWindow
 from .game_info import GameInfo
+from .play_history import PlayHistory
+from .launch_trace import LaunchTrace, load_launch_times
+from .launch_scheduler import LaunchScheduler
+from .prefix_warmer import PrefixWarmer
+from .game_logs import GameLogWriter, LogRetention
+from .output_reader import OutputReader
+from .log_throttle import LogThrottle
+from .launch_plan import LaunchPlanner, LaunchPlanError, merge_game_flags, DEFAULT_WINEPREFIX, DEFAULT_PROTONPATH
 import signal
 import requests
 import logging
@@ -17,13 +27,75 @@ import logging
 logger = logging.getLogger('umu-launcher')
 
 class GameList(Gtk.Box):
+    # Seconds between saves of the config while artwork is being fetched
+    ARTWORK_SAVE_INTERVAL = 5
+
     def __init__(self, app, display):
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
         self.app = app
         self.display = display
-        self.icon_manager = IconManager(app.config.get('steamgriddb_api_key'))
-        self.log_windows = {}  # Store log windows for each game
+        self.icon_manager = IconManager(
+            app.config.get('steamgriddb_api_key'),
+            cache_ttl=app.config.get('steamgrid_cache_ttl', 86400),
+            cache_max_bytes=app.config.get('steamgrid_cache_bytes', 20 * 1024 * 1024),
+            artwork_max_bytes=app.config.get('artwork_cache_bytes', 200 * 1024 * 1024),
+            max_download_bytes=app.config.get('artwork_max_download_bytes', 10 * 1024 * 1024),
+            request_rate=app.config.get('steamgrid_rate', 10),
+            max_retries=app.config.get('steamgrid_max_retries', 3),
+            # --steamgrid-url beats the config file
+            base_url=os.environ.get(SteamGridDB.BASE_URL_ENV) or app.config.get('steamgrid_base_url') or None,
+            keep_original_artwork=app.config.get('artwork_keep_original', False)
+        )
+        self.icon_manager.sync_references(app.config.get('games', []))
+        self.log_windows = {}  # Log channel of each game in the shared log window
+        try:
+            self.history = PlayHistory()
+        except Exception as e:
+            logger.error(f"Error opening play history: {e}")
+            self.history = None
         self.is_grid = app.config.get('is_grid_view', False)  # Load grid state from config
+        self.sort_recent = app.config.get('sort_recently_played', False)
+        self.recent_order = {}  # Rank of each game path by last played
+        self.update_recent_order()
+        self.game_widgets = {}  # FlowBoxChild of each game for row updates
+        
+        # Serialize launches per WINEPREFIX and cap concurrent launches
+        self.scheduler = LaunchScheduler(
+            self.launch_game,
+            max_concurrent=app.config.get('max_concurrent_launches', 2),
+            max_bootstraps=app.config.get('max_concurrent_bootstraps', 1),
+            on_state_changed=self.update_game_row
+        )
+        
+        # Resolves wrappers and umu-run and validates the launch environment
+        self.launch_planner = LaunchPlanner(app.config.get('umu_run_command', 'umu-run'))
+        
+        # Opt-in persistent wineservers for prefixes about to be launched
+        self.prefix_warmer = PrefixWarmer(app.config.get('prewarm_timeout', 300))
+        
+        # Compresses and expires saved session logs
+        self.log_retention = LogRetention(
+            max_count=app.config.get('log_retention_count', 20),
+            max_bytes=app.config.get('log_retention_bytes', 200 * 1024 * 1024),
+            compression=app.config.get('log_compression', 'gzip')
+        )
+        self.log_retention.apply_async()
+        
+        # One thread reads the output of every running game
+        self.output_reader = OutputReader()
+        
+        # Finds icons for games without one in the background
+        self.artwork_fetcher = ArtworkFetcher(
+            self.icon_manager.steamgrid,
+            self.icon_manager.artwork_store,
+            rate=app.config.get('artwork_fetch_rate', 4),
+            burst=app.config.get('artwork_fetch_rate', 4),
+            max_workers=app.config.get('artwork_fetch_workers', 4),
+            max_download_bytes=app.config.get('artwork_max_download_bytes', 10 * 1024 * 1024)
+        )
+        self.artwork_save_source_id = None  # Pending save of fetched icons
+        if self.icon_manager.steamgrid and self.icon_manager.artwork_store and self.artwork_fetcher.pending_run():
+            GLib.idle_add(self.resume_artwork_fetch)
 
         # Enable drag and drop
         drop_target = Gtk.DropTarget.new(Gio.File, Gdk.DragAction.COPY)
@@ -163,6 +235,13 @@ class GameList(Gtk.Box):
                 padding: 2px 8px;
                 border-radius: 12px;
             }
+            .queued-label {
+                font-size: 12px;
+                background: alpha(@theme_fg_color, 0.2);
+                color: @theme_fg_color;
+                padding: 2px 8px;
+                border-radius: 12px;
+            }
             .empty-state {
                 margin: 48px;
                 padding: 24px;
@@ -214,6 +293,11 @@ class GameList(Gtk.Box):
         # Store the game reference
         game_box.game = game
         
+        # Show playtime summary from the play history
+        playtime_text = self.format_playtime(game)
+        if playtime_text:
+            game_box.set_tooltip_text(playtime_text)
+        
         # Enable drag source
         drag_source = Gtk.DragSource.new()
         drag_source.set_actions(Gdk.DragAction.MOVE)
@@ -228,6 +312,11 @@ class GameList(Gtk.Box):
         drop_target.connect('enter', self.on_reorder_enter, game_box)
         drop_target.connect('leave', self.on_reorder_leave, game_box)
         game_box.add_controller(drop_target)
+        
+        # Pre-warm the game's prefix while the pointer is over it
+        motion = Gtk.EventControllerMotion.new()
+        motion.connect('enter', lambda controller, x, y: self.warm_prefix(game))
+        game_box.add_controller(motion)
 
         if self.is_grid:
             # Grid mode: Vertical layout
@@ -242,7 +331,7 @@ class GameList(Gtk.Box):
             # Load icon
             if game.icon and os.path.exists(game.icon):
                 try:
-                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(game.icon, 96, 96)
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(self.icon_manager.sized_icon(game.icon, 96), 96, 96)
                     icon.set_from_pixbuf(pixbuf)
                 except Exception as e:
                     logger.error(f"Error loading icon: {e}")
@@ -280,7 +369,7 @@ class GameList(Gtk.Box):
             # Load icon
             if game.icon and os.path.exists(game.icon):
                 try:
-                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(game.icon, 64, 64)
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(self.icon_manager.sized_icon(game.icon, 64), 64, 64)
                     icon.set_from_pixbuf(pixbuf)
                 except Exception as e:
                     logger.error(f"Error loading icon: {e}")
@@ -313,12 +402,23 @@ class GameList(Gtk.Box):
         button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=4)
         button_box.set_halign(Gtk.Align.CENTER if self.is_grid else Gtk.Align.END)
         
+        # Show queued state while waiting for a launch slot
+        if self.scheduler.is_queued(game):
+            queued_label = Gtk.Label(label="Queued")
+            queued_label.add_css_class('queued-label')
+            queued_label.set_valign(Gtk.Align.CENTER)
+            button_box.append(queued_label)
+        
         # Add play button
         play_button = Gtk.Button()
         if game.process and game.process.poll() is None:
             play_button.set_icon_name('media-playback-stop-symbolic')
             play_button.set_tooltip_text('Stop Game')
             play_button.add_css_class('destructive-action')
+        elif self.scheduler.is_queued(game):
+            play_button.set_icon_name('process-stop-symbolic')
+            play_button.set_tooltip_text('Cancel Queued Launch')
+            play_button.add_css_class('destructive-action')
         else:
             play_button.set_icon_name('media-playback-start-symbolic')
             play_button.set_tooltip_text('Play Game')
@@ -368,11 +468,13 @@ class GameList(Gtk.Box):
             self.game_box.remove(child)
         
         # Add games back with current layout
+        self.game_widgets = {}
         for game in self.app.games:
             game_widget = self.create_game_widget(game)
             flow_child = Gtk.FlowBoxChild()
             flow_child.set_child(game_widget)
             self.game_box.append(flow_child)
+            self.game_widgets[game] = flow_child
             
         # Add empty state if no games
         if not self.app.games:
@@ -408,6 +510,14 @@ class GameList(Gtk.Box):
             flow_child.set_child(empty_box)
             self.game_box.append(flow_child)
     
+    def update_game_row(self, game):
+        """Rebuild the row of a single game without refreshing the whole list"""
+        flow_child = self.game_widgets.get(game)
+        if flow_child is None:
+            return False
+        flow_child.set_child(self.create_game_widget(game))
+        return False  # Usable as a one-shot GLib callback
+    
     def check_game_status(self, game):
         """Check if a game is still running and update UI accordingly"""
         try:
@@ -415,6 +525,8 @@ class GameList(Gtk.Box):
             if game.process and game.process.poll() is not None:
                 # Game has stopped
                 logger.info(f"Game {game.name} has stopped")
+                self.end_session(game)
+                self.scheduler.release(game)
                 # Add stop message to log
                 if game in self.log_windows:
                     GLib.idle_add(self.log_windows[game].append_text, f"\n=== Game stopped at {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n")
@@ -514,6 +626,9 @@ class GameList(Gtk.Box):
                     if self.app.shared_log_window:
                         self.app.shared_log_window.append_text(f"ERROR: {error_msg}\n")
             
+            # Close the play session before dropping the process
+            self.end_session(game)
+            
             # Clear the process reference
             game.process = None
             
@@ -532,8 +647,56 @@ class GameList(Gtk.Box):
         # Always refresh UI
         GLib.idle_add(self.refresh)
 
+    def end_session(self, game):
+        """Record the end of a game's play session in the history"""
+        if not self.history or game.session_id is None:
+            return
+        try:
+            exit_code = game.process.poll() if game.process else None
+            self.history.end_session(game.session_id, exit_code)
+        except Exception as e:
+            logger.error(f"Error recording end of play session: {e}")
+        game.session_id = None
+        self.update_recent_order()
+
+    def update_recent_order(self):
+        """Reload the order of games by when they were last played"""
+        if not self.history:
+            return
+        try:
+            self.recent_order = {path: rank for rank, path in enumerate(self.history.recently_played())}
+        except Exception as e:
+            logger.error(f"Error reading play history: {e}")
+
+    def end_open_sessions(self):
+        """Close the play sessions of games still running when the launcher quits"""
+        for game in self.app.games:
+            self.end_session(game)
+        if self.history:
+            self.history.close()
+            self.history = None
+
+    def format_playtime(self, game):
+        """Format total playtime and last played date for a game"""
+        if not self.history:
+            return None
+        try:
+            stats = self.history.get_stats(game.file_path)
+        except Exception as e:
+            logger.error(f"Error reading play history: {e}")
+            return None
+        if not stats['session_count']:
+            return None
+        
+        minutes = int(stats['total_playtime'] // 60)
+        last_played = time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['last_played']))
+        return f"Played {minutes // 60}h {minutes % 60}m · Last played {last_played}"
+
     def on_launch_clicked(self, button, game):
-        if game.process and game.process.poll() is None:
+        if self.scheduler.is_queued(game):
+            # Launch is waiting for a slot, cancel it
+            self.scheduler.cancel(game)
+        elif game.process and game.process.poll() is None:
             # Game is running, stop it
             button.set_icon_name('media-playback-start-symbolic')
             button.set_tooltip_text('Play Game')
@@ -546,106 +709,154 @@ class GameList(Gtk.Box):
             button.set_tooltip_text('Stop Game')
             button.remove_css_class('suggested-action')
             button.add_css_class('destructive-action')
-            self.launch_game(game)
+            self.schedule_launch(game)
+
+    def get_game_flags(self, game):
+        """Get the launch flags of a game (global settings overridden by game settings)"""
+        return merge_game_flags(self.app.config, game.file_path)
+
+    def get_game_prefix(self, flags):
+        """Get the WINEPREFIX and PROTONPATH from launch flags, with defaults"""
+        wineprefix = os.path.expanduser(flags.get('wineprefix', '').strip() or DEFAULT_WINEPREFIX)
+        protonpath = os.path.expanduser(flags.get('protonpath', '').strip() or DEFAULT_PROTONPATH)
+        return wineprefix, protonpath
+
+    def dry_run(self, game):
+        """
+        Build the launch plan of a game without spawning anything
+        
+        Returns:
+            dict: argv, env, cwd, wineprefix and protonpath of the launch
+        
+        Raises:
+            LaunchPlanError: If the game cannot be launched as configured
+        """
+        self.launch_planner.umu_run_command = self.app.config.get('umu_run_command', 'umu-run')
+        return self.launch_planner.plan(game.file_path, self.get_game_flags(game)).to_dict()
+
+    def warm_prefix(self, game):
+        """Start a persistent wineserver for the game's prefix if pre-warming is enabled"""
+        flags = self.get_game_flags(game)
+        if not flags.get('prewarm_wineserver', False):
+            return False
+        if game.process and game.process.poll() is None:
+            return False
+        try:
+            wineprefix, protonpath = self.get_game_prefix(flags)
+            return self.prefix_warmer.warm(wineprefix, protonpath)
+        except Exception as e:
+            logger.error(f"Error pre-warming prefix: {e}")
+            return False
+
+    def schedule_launch(self, game):
+        """Queue a game launch behind other launches using the same WINEPREFIX"""
+        wineprefix, protonpath = self.get_game_prefix(self.get_game_flags(game))
+        if not self.scheduler.submit(game, wineprefix):
+            # Already queued or launching, restore the row's button state
+            self.update_game_row(game)
 
     def launch_game(self, game):
         """Launch a game with the configured settings"""
+        trace = LaunchTrace(game.name, game.file_path)
         try:
             # Get game configuration
-            flags = self.app.config['flags'].copy()  # Start with global settings as defaults
-            for game_config in self.app.config['games']:
-                if isinstance(game_config, dict) and game_config.get('path') == game.file_path:
-                    # Override with game-specific settings if they exist
-                    game_flags = game_config.get('flags', {})
-                    flags.update(game_flags)
-                    break
-            
-            # Build command
-            command = []
-            
-            # Add gamemoderun if enabled
-            if flags.get('gamemode', False):
-                command.extend(['gamemoderun'])
-                
-            # Add mangohud if enabled
-            if flags.get('mangohud', False):
-                command.extend(['mangohud'])
+            with trace.span('config'):
+                flags = self.get_game_flags(game)
+                self.launch_planner.umu_run_command = self.app.config.get('umu_run_command', 'umu-run')
             
-            # Add umu-run
-            command.extend(['umu-run'])
-            
-            # Add the game path
-            command.append(game.file_path)
-            
-            # Add additional flags if any
-            additional_flags = flags.get('additional_flags', '').strip()
-            if additional_flags:
-                command.extend(additional_flags.split())
+            # Build command and environment, failing early on a missing
+            # wrapper or an unusable PROTONPATH/WINEPREFIX
+            try:
+                with trace.span('command_build'):
+                    command = self.launch_planner.build_command(game.file_path, flags)
+                with trace.span('env_build'):
+                    env, wineprefix, protonpath = self.launch_planner.build_env(flags)
+            except LaunchPlanError as e:
+                error_msg = f"Error: {e}"
+                logger.error(error_msg)
+                if self.app.shared_log_window:
+                    self.app.shared_log_window.append_text(f"ERROR: {error_msg}\n")
+                self.app.show_error_dialog(error_msg)
+                game.process = None
+                GLib.idle_add(self.refresh)
+                return False
             
             logger.info(f"Launching game with command: {' '.join(command)}")
             
             # Get or create shared log window without showing it
             if not self.app.shared_log_window:
                 self.app.create_log_window()
-            log_window = self.app.shared_log_window
+            
+            # The game's output goes to its own channel (tab) of the log window
+            log_window = self.app.shared_log_window.get_channel(game.file_path, game.name)
+            self.log_windows[game] = log_window
             
             # Write launch info to log without showing it
+            self.app.shared_log_window.append_text(f"\n=== Starting {game.name} at {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n")
             log_window.append_text(f"\n=== Starting {game.name} at {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n")
             log_window.append_text(f"Command: {' '.join(command)}\n\n")
             
-            def log_output(pipe, prefix=""):
-                try:
-                    for line in pipe:
-                        GLib.idle_add(log_window.append_text, f"{prefix}{line}")
-                except Exception as e:
-                    logger.error(f"Error logging output: {e}")
+            log_file = None
             
-            # Setup environment
-            env = os.environ.copy()
+            # Collapse repeats and rate-limit noisy channels on screen, the
+            # session log file still gets every line
+            throttle = LogThrottle(
+                channel_rate=self.app.config.get('log_channel_rate', 100),
+                channel_burst=self.app.config.get('log_channel_burst', 500),
+                dedup=self.app.config.get('log_dedup', True)
+            )
             
-            # Set GAMEID from game-specific config, fallback to default
-            env['GAMEID'] = flags.get('gameid', 'umu-dauntless').strip()
+            def log_output(line, prefix=""):
+                trace.observe_output(line)
+                if log_file:
+                    log_file.write(f"{prefix}{line}")
+                for shown in throttle.process(f"{prefix}{line}", prefix):
+                    log_window.queue_text(shown)
             
-            # Set STORE type (default to egs)
-            env['STORE'] = flags.get('store', 'egs').strip()
+            def close_output(prefix=""):
+                for shown in throttle.flush(prefix):
+                    log_window.queue_text(shown)
+                if log_file:
+                    log_file.detach()
             
-            # Use configured wine prefix, ensure it's never empty
-            wineprefix = flags.get('wineprefix', '').strip()
-            if not wineprefix:
-                wineprefix = os.path.expanduser('~/.wine')
-            env['WINEPREFIX'] = wineprefix
+            # Note whether the launch attaches to a pre-warmed wineserver
+            if flags.get('prewarm_wineserver', False):
+                trace.tags['prewarmed'] = self.prefix_warmer.is_warm(wineprefix)
             
-            # Use configured proton path, ensure it exists
-            protonpath = flags.get('protonpath', '').strip()
-            if not protonpath:
-                protonpath = os.path.expanduser('~/.local/share/Steam/compatibilitytools.d/UMU-Latest')
+            # Create process group with output logging
+            with trace.span('popen'):
+                game.process = subprocess.Popen(
+                    command,
+                    start_new_session=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    env=env,  # Use the planned environment
+                    cwd=os.path.dirname(game.file_path)  # Set working directory to game directory
+                )
             
-            if not os.path.exists(protonpath):
-                error_msg = f"Error: PROTONPATH directory does not exist: {protonpath}"
-                logger.error(error_msg)
-                if self.app.shared_log_window:
-                    self.app.shared_log_window.append_text(f"ERROR: {error_msg}\n")
-                self.app.show_error_dialog(error_msg)
-                return
-                
-            env['PROTONPATH'] = protonpath
+            # Record the session in the play history
+            if self.history:
+                try:
+                    game.session_id = self.history.start_session(game.file_path, flags, protonpath)
+                except Exception as e:
+                    logger.error(f"Error recording play session: {e}")
             
-            # Create process group with output logging
-            game.process = subprocess.Popen(
-                command,
-                start_new_session=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                bufsize=1,
-                env=env,  # Use our modified environment
-                cwd=os.path.dirname(game.file_path)  # Set working directory to game directory
-            )
+            # Save the output of the session to disk
+            if self.app.config.get('log_to_file', True):
+                log_file = self.open_log_file(game, command)
+            
+            # Read stdout and stderr on the shared output reader. Each
+            # stream holds the log file open until it closes, attach both
+            # before reading so an early end of stdout can't close the log
+            # while stderr still has output
+            if log_file:
+                log_file.attach()  # stdout
+                log_file.attach()  # stderr
+            self.output_reader.add(game.process.stdout, log_output, close_output)
+            self.output_reader.add(game.process.stderr, lambda line: log_output(line, "ERROR: "), lambda: close_output("ERROR: "))
             
-            # Start output logging threads
-            import threading
-            threading.Thread(target=log_output, args=(game.process.stdout,), daemon=True).start()
-            threading.Thread(target=log_output, args=(game.process.stderr, "ERROR: "), daemon=True).start()
+            # Report timings once the game's executable is up
+            trace.watch_process(game.process, on_finish=lambda t: self.on_launch_traced(game, t))
             
             # Don't show log window by default
             self.app.log_button.remove_css_class('suggested-action')
@@ -655,11 +866,46 @@ class GameList(Gtk.Box):
             
             # Refresh UI
             GLib.idle_add(self.refresh)
+            return True
             
         except Exception as e:
             logger.error(f"Error launching game: {e}")
             game.process = None
             GLib.idle_add(self.refresh)
+            return False
+
+    def open_log_file(self, game, command):
+        """
+        Open a session log file for a launch
+        
+        Returns:
+            GameLogWriter: Writer for the session, or None if the file can't be created
+        """
+        self.log_retention.max_count = self.app.config.get('log_retention_count', 20)
+        self.log_retention.max_bytes = self.app.config.get('log_retention_bytes', 200 * 1024 * 1024)
+        self.log_retention.compression = self.app.config.get('log_compression', 'gzip')
+        try:
+            # Compress older sessions once this one is complete
+            writer = GameLogWriter(game.name, on_close=lambda w: self.log_retention.apply())
+        except Exception as e:
+            logger.error(f"Error creating game log file: {e}")
+            return None
+        writer.write(f"=== Starting {game.name} at {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n")
+        writer.write(f"Command: {' '.join(command)}\n\n")
+        return writer
+
+    def on_launch_traced(self, game, trace):
+        """Show the timings of a finished launch trace (called from the watcher thread)"""
+        # The launch has settled, let queued launches on the same prefix go
+        GLib.idle_add(self.scheduler.release, game)
+        
+        # The finished trace may have been saved, leave it out of the comparison
+        previous = [t for t in load_launch_times(trace.game_path, limit=21)
+                    if t.get('time') != trace.wall_time][-20:]
+        summary = trace.format_summary(previous)
+        logger.info(summary.rstrip())
+        if game in self.log_windows:
+            GLib.idle_add(self.log_windows[game].append_text, summary, "debug")
 
     def on_remove_clicked(self, button, game):
         # Get the toplevel window
@@ -718,6 +964,70 @@ class GameList(Gtk.Box):
         config_window.set_transient_for(self.get_root())
         config_window.present()
 
+    def fetch_missing_artwork(self):
+        """Find icons for all games without one in the background"""
+        if not self.icon_manager.steamgrid:
+            self.app.show_error_dialog("Please add your SteamGridDB API key in Settings to fetch artwork.")
+            return
+        if not self.icon_manager.artwork_store:
+            self.app.show_error_dialog("Artwork can't be saved, the artwork cache could not be opened.")
+            return
+        if self.artwork_fetcher.running:
+            return
+        games = [(game.file_path, game.name) for game in self.app.games
+                 if not game.icon or not os.path.exists(game.icon)]
+        if not games:
+            return
+        self.artwork_fetcher.client = self.icon_manager.steamgrid
+        self.artwork_fetcher.start(games, self.on_artwork_fetched, self.on_artwork_fetch_done)
+    
+    def resume_artwork_fetch(self):
+        """Continue an artwork run interrupted by closing the launcher"""
+        if self.icon_manager.steamgrid and self.icon_manager.artwork_store:
+            self.artwork_fetcher.client = self.icon_manager.steamgrid
+            self.artwork_fetcher.resume(self.on_artwork_fetched, self.on_artwork_fetch_done)
+        return False
+    
+    def on_artwork_fetched(self, game_path, icon_path):
+        """Called from the artwork fetcher's threads when an icon arrived"""
+        GLib.idle_add(self.set_fetched_icon, game_path, icon_path)
+    
+    def set_fetched_icon(self, game_path, icon_path):
+        """Give a game the icon found for it and update only its row"""
+        for game in self.app.games:
+            if game.file_path != game_path:
+                continue
+            # The user may have picked an icon in the meantime
+            if game.icon and os.path.exists(game.icon):
+                break
+            game.icon = icon_path
+            for game_config in self.app.config.get('games', []):
+                if isinstance(game_config, dict) and game_config.get('path') == game_path:
+                    game_config['icon'] = icon_path
+                    break
+            self.update_game_row(game)
+            # Save every few seconds, so icons survive closing the launcher mid-run
+            if self.artwork_save_source_id is None:
+                self.artwork_save_source_id = GLib.timeout_add_seconds(
+                    self.ARTWORK_SAVE_INTERVAL, self.save_fetched_icons
+                )
+            break
+        return False
+    
+    def save_fetched_icons(self):
+        """Save the icons fetched so far"""
+        self.artwork_save_source_id = None
+        self.app.save_config()
+        return False
+    
+    def on_artwork_fetch_done(self, found, tried):
+        """Called from the artwork fetcher's threads when the run is over"""
+        def save():
+            logger.info(f"Fetched icons for {found} of {tried} games")
+            self.app.save_config()
+            return False
+        GLib.idle_add(save)
+    
     def toggle_layout(self):
         """Toggle between list and grid layout"""
         self.is_grid = not self.is_grid
@@ -841,4 +1151,19 @@ class GameList(Gtk.Box):
         game2 = child2.get_child().game
         idx1 = self.app.games.index(game1)
         idx2 = self.app.games.index(game2)
+        if self.sort_recent:
+            # Most recently played first, games never played keep their order after them
+            never = len(self.recent_order)
+            rank1 = self.recent_order.get(game1.file_path, never)
+            rank2 = self.recent_order.get(game2.file_path, never)
+            if rank1 != rank2:
+                return rank1 - rank2
         return idx1 - idx2
+
+    def set_sort_recent(self, sort_recent):
+        """Order games by when they were last played instead of by the configured order"""
+        self.sort_recent = sort_recent
+        self.app.config['sort_recently_played'] = sort_recent
+        self.app.save_config()
+        self.update_recent_order()
+        self.game_box.invalidate_sort()
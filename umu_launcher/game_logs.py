@@ -0,0 +1,295 @@
+import os
+import re
+import gzip
+import lzma
+import time
+import queue
+import shutil
+import threading
+import logging
+
+logger = logging.getLogger('umu-launcher')
+
+LOGS_DIR = os.path.expanduser('~/.local/state/umu-launcher/logs')
+
+# Suffixes of compressed session logs by compression method
+COMPRESSORS = {
+    'gzip': ('.gz', gzip.open),
+    'xz': ('.xz', lzma.open),
+}
+
+# Session logs being written, left alone by retention
+_active_paths = set()
+_active_lock = threading.Lock()
+
+def safe_name(name):
+    """Turn a game name into a directory name"""
+    name = re.sub(r'[^\w.-]+', '_', name).strip('._')
+    return name or 'game'
+
+def game_log_dir(game_name, logs_dir=LOGS_DIR):
+    """Directory holding the session logs of a game"""
+    return os.path.join(logs_dir, safe_name(game_name))
+
+def list_session_logs(game_name, logs_dir=LOGS_DIR):
+    """
+    List the saved session logs of a game
+
+    Returns:
+        list: Paths of plain and compressed session logs, newest last
+    """
+    directory = game_log_dir(game_name, logs_dir)
+    try:
+        names = [name for name in os.listdir(directory) if _is_session_log(name)]
+    except FileNotFoundError:
+        return []
+    return _by_age(os.path.join(directory, name) for name in names)
+
+def _is_session_log(name):
+    return name.endswith('.log') or any(name.endswith('.log' + suffix) for suffix, _ in COMPRESSORS.values())
+
+def _variants(path):
+    """A session log path and the paths of its compressed forms"""
+    return [path] + [path + suffix for suffix, _ in COMPRESSORS.values()]
+
+def _by_age(paths):
+    """Sort session logs oldest first (compression keeps the mtime)"""
+    def key(path):
+        try:
+            return os.stat(path).st_mtime, path
+        except OSError:
+            return 0, path
+    return sorted(paths, key=key)
+
+class GameLogWriter:
+    """
+    Streams the output of one launch to a session log file
+
+    Lines are handed to a writer thread through a bounded queue and written
+    in batches, flushed every flush_interval seconds. Writing never blocks:
+    when the disk can't keep up and the queue is full, lines are dropped
+    and a note of how many is written to the log instead. The writer
+    closes the file once every attached stream has detached.
+    """
+
+    # Lines buffered before further lines are dropped
+    QUEUE_SIZE = 10000
+
+    def __init__(self, game_name, logs_dir=LOGS_DIR, flush_interval=1.0, on_close=None):
+        """
+        Open a new session log
+
+        Args:
+            game_name: Name of the game
+            logs_dir: Directory holding the logs of all games
+            flush_interval: Seconds between flushes to disk
+            on_close: Called with this writer after the file is closed (from the writer thread)
+        """
+        directory = game_log_dir(game_name, logs_dir)
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        self.path = os.path.join(directory, f'{stamp}.log')
+        suffix = 1
+        while any(os.path.exists(path) for path in _variants(self.path)):
+            suffix += 1
+            self.path = os.path.join(directory, f'{stamp}-{suffix}.log')
+
+        self.flush_interval = flush_interval
+        self.on_close = on_close
+        self.streams = 0
+        self.closed = False
+        self.dropped = 0  # Lines dropped since the last batch was written
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(self.QUEUE_SIZE)
+        self._file = open(self.path, 'w', encoding='utf-8', errors='replace')
+        with _active_lock:
+            _active_paths.add(self.path)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def attach(self):
+        """Register a stream that writes to this log"""
+        with self._lock:
+            self.streams += 1
+
+    def detach(self):
+        """Unregister a stream, closing the log when it was the last one"""
+        with self._lock:
+            self.streams -= 1
+            last = self.streams <= 0
+        if last:
+            self.close()
+
+    def write(self, text):
+        """Queue text for the log from any thread without blocking"""
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def close(self):
+        """Flush and close the log (the writer thread finishes in the background)"""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # The writer thread sees closed once it has drained the queue
+
+    def _run(self):
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    text = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    if self.closed:
+                        break
+                    text = ''
+                if text is None:
+                    break
+                if text:
+                    # Write everything that is already queued in one go
+                    batch = [text]
+                    try:
+                        while len(batch) < 1000:
+                            text = self._queue.get_nowait()
+                            if text is None:
+                                break
+                            batch.append(text)
+                    except queue.Empty:
+                        pass
+                    with self._lock:
+                        dropped = self.dropped
+                        self.dropped = 0
+                    if dropped:
+                        batch.append(f"[... {dropped} lines dropped, the log file could not keep up ...]\n")
+                    self._file.write(''.join(batch))
+                    if text is None:
+                        break
+                if time.monotonic() - last_flush >= self.flush_interval:
+                    self._file.flush()
+                    last_flush = time.monotonic()
+        except Exception as e:
+            logger.error(f"Error writing game log {self.path}: {e}")
+        finally:
+            try:
+                self._file.close()
+            except Exception as e:
+                logger.error(f"Error closing game log {self.path}: {e}")
+            with _active_lock:
+                _active_paths.discard(self.path)
+
+        if self.on_close:
+            try:
+                self.on_close(self)
+            except Exception as e:
+                logger.error(f"Error after closing game log: {e}")
+
+class LogRetention:
+    """
+    Compresses finished session logs and removes old ones
+
+    Limits apply per game by count and across all games by total size,
+    the oldest sessions are removed first.
+    """
+
+    def __init__(self, logs_dir=LOGS_DIR, max_count=20, max_bytes=200 * 1024 * 1024, compression='gzip'):
+        """
+        Args:
+            logs_dir: Directory holding the logs of all games
+            max_count: Session logs kept per game (0 for no limit)
+            max_bytes: Total size of all session logs (0 for no limit)
+            compression: 'gzip', 'xz' or 'none'
+        """
+        self.logs_dir = logs_dir
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self._lock = threading.Lock()
+
+    def apply_async(self):
+        """Run retention in a background thread"""
+        threading.Thread(target=self.apply, daemon=True).start()
+
+    def apply(self):
+        """Compress finished logs and enforce the retention limits"""
+        # One pass at a time, logs closed meanwhile are handled by the next pass
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            sessions = []
+            for game in os.listdir(self.logs_dir) if os.path.isdir(self.logs_dir) else []:
+                directory = os.path.join(self.logs_dir, game)
+                if not os.path.isdir(directory):
+                    continue
+                paths = _by_age(os.path.join(directory, name) for name in os.listdir(directory) if _is_session_log(name))
+                with _active_lock:
+                    active = _active_paths.copy()
+                paths = [self.compress(path) if path not in active else path for path in paths]
+
+                # Drop the oldest sessions of the game over the count limit
+                finished = [path for path in paths if path not in active]
+                excess = max(0, len(finished) - self.max_count) if self.max_count else 0
+                for path in finished[:excess]:
+                    self.remove(path)
+                sessions.extend(finished[excess:])
+
+            # Drop the oldest sessions of all games over the size limit
+            if self.max_bytes:
+                sizes = {}
+                for path in sessions:
+                    try:
+                        sizes[path] = os.stat(path)
+                    except OSError:
+                        pass
+                total = sum(stat.st_size for stat in sizes.values())
+                for path in sorted(sizes, key=lambda p: sizes[p].st_mtime):
+                    if total <= self.max_bytes:
+                        break
+                    total -= sizes[path].st_size
+                    self.remove(path)
+        except Exception as e:
+            logger.error(f"Error applying log retention: {e}")
+        finally:
+            self._lock.release()
+
+    def compress(self, path):
+        """
+        Compress a finished session log
+
+        Returns:
+            str: Path of the compressed log, or the original path if it was
+                 not compressed
+        """
+        if self.compression not in COMPRESSORS or not path.endswith('.log'):
+            return path
+        suffix, opener = COMPRESSORS[self.compression]
+        target = path + suffix
+        temp = target + '.tmp'
+        try:
+            with open(path, 'rb') as source, opener(temp, 'wb') as dest:
+                shutil.copyfileobj(source, dest, 1024 * 1024)
+            stat = os.stat(path)
+            os.utime(temp, (stat.st_atime, stat.st_mtime))
+            os.replace(temp, target)
+            os.remove(path)
+            return target
+        except Exception as e:
+            logger.error(f"Error compressing game log {path}: {e}")
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return path
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Error removing old game log {path}: {e}")
@@ -1,19 +1,48 @@
 import os
 import json
 import time
-import requests
+import threading
 from pathlib import Path
 import gi
 gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, GdkPixbuf, Gio, GLib, Gdk
-from steamgrid_api import SteamGridDB
+from .steamgrid_api import SteamGridDB, CancelToken, RequestCancelled
+from .response_cache import ResponseCache
+from .artwork_store import ArtworkStore
+from .artwork_normalizer import ArtworkNormalizer
 
 class IconManager:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache_ttl=86400, cache_max_bytes=20 * 1024 * 1024,
+                 artwork_max_bytes=200 * 1024 * 1024, max_download_bytes=10 * 1024 * 1024,
+                 request_rate=10, max_retries=3, base_url=None, keep_original_artwork=False):
         self.icon_theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
-        self.cache_dir = os.path.expanduser('~/.cache/umu-launcher/icons')
-        os.makedirs(self.cache_dir, exist_ok=True)
-        self.steamgrid = SteamGridDB(api_key) if api_key else None
+        self.max_download_bytes = max_download_bytes  # Largest artwork file downloaded
+        # Downloaded artwork, kept across runs as small variants in the sizes shown
+        try:
+            self.artwork_store = ArtworkStore(
+                max_bytes=artwork_max_bytes,
+                normalizer=ArtworkNormalizer(),
+                keep_original=keep_original_artwork
+            )
+            threading.Thread(target=self.artwork_store.normalize_pending, daemon=True).start()
+        except Exception as e:
+            print(f"Error opening artwork store: {e}")
+            self.artwork_store = None
+        # Searches and icon listings survive restarts and work offline
+        try:
+            self.response_cache = ResponseCache(ttl=cache_ttl, max_bytes=cache_max_bytes)
+        except Exception as e:
+            print(f"Error opening SteamGridDB response cache: {e}")
+            self.response_cache = None
+        # Passed to every SteamGridDB client, also after the API key changes
+        self.client_options = {
+            'base_url': base_url,
+            'cache': self.response_cache,
+            'rate': request_rate,
+            'burst': max(1, int(request_rate * 2)),
+            'max_retries': max_retries
+        }
+        self.steamgrid = SteamGridDB(api_key, **self.client_options) if api_key else None
 
     def _paintable_to_pixbuf(self, paintable):
         """Convert a Gtk.IconPaintable to GdkPixbuf"""
@@ -33,31 +62,175 @@ class IconManager:
         
         return None
 
+    def _icon_results(self, query, icons):
+        """Turn SteamGridDB icons into search results"""
+        results = []
+        for icon in icons:
+            icon_url = icon.get('url')
+            if icon_url:
+                results.append({
+                    'name': query,
+                    'category': 'games',
+                    'url': icon_url,
+                    'source': 'steamgrid'
+                })
+        return results
+
     def search_icons(self, query, callback=None):
         """Search for icons in SteamGridDB"""
         results = []
         
         # Search SteamGridDB
         try:
-            icons = self.search_steamgrid(query)
-            for icon in icons:
-                icon_url = icon.get('url')
-                if icon_url:
-                    # Generate a cache filename
-                    cache_filename = os.path.join(self.cache_dir, f"steamgrid_{hash(icon_url)}.png")
-                    results.append({
-                        'name': query,
-                        'category': 'games',
-                        'filename': cache_filename,
-                        'url': icon_url,
-                        'source': 'steamgrid'
-                    })
+            results = self._icon_results(query, self.search_steamgrid(query))
         except Exception as e:
             print(f"Error searching SteamGridDB: {e}")
         
         if callback:
             callback(results)
         return results
+
+    def search_icons_async(self, query, callback, parent_window=None):
+        """
+        Search for icons in SteamGridDB without blocking the main loop
+
+        The requests run on the SteamGridDB client's thread pool and the
+        results are passed to callback on the main loop, unless the search
+        was cancelled first.
+
+        Args:
+            query: Game title to search for
+            callback: Called with the list of results
+            parent_window: Parent of the dialog shown when no API key is set
+
+        Returns:
+            CancelToken: Token to cancel the search, or None if no search was started
+        """
+        if not self.steamgrid:
+            # Shows the API key dialog
+            callback(self.search_steamgrid(query, parent_window))
+            return None
+
+        cancel = CancelToken()
+        self._run_async(lambda: self._search_steamgrid_icons(query, cancel), callback, cancel,
+                        "Error searching SteamGridDB", [])
+        return cancel
+
+    def _run_async(self, fn, callback, cancel, error_message, default=None):
+        """
+        Run fn on the SteamGridDB client's thread pool (a thread without a client)
+
+        Its result (default if it failed) is passed to callback on the
+        main loop, unless cancel was cancelled first.
+        """
+        def deliver(result):
+            if not (cancel and cancel.cancelled):
+                callback(result)
+            return False
+
+        def run():
+            try:
+                result = fn()
+            except RequestCancelled:
+                return
+            except Exception as e:
+                print(f"{error_message}: {e}")
+                result = default
+            if not (cancel and cancel.cancelled):
+                GLib.idle_add(deliver, result)
+
+        if self.steamgrid:
+            self.steamgrid.submit(run)
+        else:
+            threading.Thread(target=run, daemon=True).start()
+
+    def load_thumbnail_async(self, icon_info, callback, size=32, cancel=None):
+        """
+        Load the thumbnail of a search result without blocking the main loop
+
+        The icon is downloaded from the result's URL on the SteamGridDB
+        client's thread pool (or read from the artwork store) and passed to
+        callback on the main loop as a pixbuf, or None if it can't be loaded.
+
+        Args:
+            icon_info: Search result from search_icons_async()
+            callback: Called with the pixbuf
+            size: Width and height of the thumbnail
+            cancel: CancelToken that drops the thumbnail
+        """
+        def load():
+            path = self.fetch_artwork(icon_info['url'], cancel)
+            if path is None:
+                return None
+            return GdkPixbuf.Pixbuf.new_from_file_at_size(self.sized_icon(path, size), size, size)
+
+        self._run_async(load, callback, cancel, "Error loading icon thumbnail")
+
+    def fetch_artwork_async(self, url, callback, cancel=None):
+        """
+        Get artwork into the artwork store without blocking the main loop
+
+        Args:
+            url: URL of the artwork
+            callback: Called on the main loop with the stored file's path, or None
+            cancel: CancelToken that drops the result
+        """
+        self._run_async(lambda: self.fetch_artwork(url, cancel), callback, cancel,
+                        "Error downloading icon")
+
+    def import_artwork_async(self, file_path, callback):
+        """
+        Copy a local image into the artwork store without blocking the main loop
+
+        Args:
+            file_path: Image to import
+            callback: Called on the main loop with the stored file's path, or None
+        """
+        if self.artwork_store is None:
+            # Use the file where it is
+            GLib.idle_add(callback, file_path)
+            return
+        self._run_async(lambda: self.artwork_store.import_file(file_path), callback, None,
+                        "Error importing icon")
+
+    def sized_icon(self, path, size):
+        """
+        Get the stored variant of an icon for the size it is shown at
+
+        Returns:
+            str: Path of the variant, or path for icons outside the artwork store
+        """
+        if self.artwork_store is None:
+            return path
+        try:
+            return self.artwork_store.variant(path, size)
+        except Exception as e:
+            print(f"Error looking up icon variant: {e}")
+            return path
+
+    def fetch_artwork(self, url, cancel=None):
+        """
+        Get artwork from the artwork store, downloading it if needed (blocking)
+
+        Returns:
+            str: Path of the stored file, or None if it couldn't be downloaded
+        """
+        if cancel:
+            cancel.check()
+        if self.artwork_store is None:
+            return None
+        path = self.artwork_store.lookup(url)
+        if path is None and self.steamgrid:
+            path = self.download_icon(url, cancel)
+        return path
+
+    def _search_steamgrid_icons(self, query, cancel=None):
+        """Search SteamGridDB and list the first icons (blocking)"""
+        games = self.steamgrid.search_games(query, cancel)
+        if not games:
+            return []
+        icons = self.steamgrid.get_icons(games[0]['id'], cancel)
+        return self._icon_results(query, icons[:3])
     
     def get_icon(self, icon_name, callback):
         """Get icon from theme or local file"""
@@ -69,26 +242,6 @@ class IconManager:
                     callback(pixbuf)
                     return
             
-            # Check if it's a SteamGridDB icon (stored in results)
-            for result in self.search_icons(icon_name):
-                if result.get('source') == 'steamgrid' and result.get('url'):
-                    cache_filename = result['filename']
-                    
-                    # Download if not already cached
-                    if not os.path.exists(cache_filename):
-                        if not self.download_icon(result['url'], cache_filename):
-                            continue
-                    
-                    # Load the downloaded icon
-                    try:
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(cache_filename, 64, 64)
-                        if pixbuf:
-                            callback(pixbuf)
-                            return
-                    except Exception as e:
-                        print(f"Error loading cached icon: {e}")
-                        continue
-            
             # Try to load from icon theme
             icon_theme_flags = Gtk.IconLookupFlags(0)  # No special flags needed
             icon_paintable = self.icon_theme.lookup_icon(
@@ -139,19 +292,23 @@ class IconManager:
             print(f"Error searching SteamGridDB: {e}")
         return []
     
-    def download_icon(self, url, cache_filename):
-        """Download an icon from SteamGridDB and cache it"""
+    def download_icon(self, url, cancel=None):
+        """
+        Download an icon from SteamGridDB into the artwork store
+
+        Returns:
+            str: Path of the stored icon, or None if the download failed
+        """
+        if not self.steamgrid or self.artwork_store is None:
+            return None
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            with open(cache_filename, 'wb') as f:
-                f.write(response.content)
-            
-            return True
+            # Reuse the client's pooled connections
+            return self.artwork_store.download(self.steamgrid, url, self.max_download_bytes, cancel)
+        except RequestCancelled:
+            raise
         except Exception as e:
             print(f"Error downloading icon: {e}")
-            return False
+            return None
     
     def get_default_icon(self):
         """Get default application icon"""
@@ -173,21 +330,39 @@ class IconManager:
         return None
 
     def clear_cache(self):
-        """Clear the icon cache directory"""
+        """Remove downloaded artwork that no game uses"""
+        if self.artwork_store is None:
+            return
         try:
-            import shutil
-            if os.path.exists(self.cache_dir):
-                shutil.rmtree(self.cache_dir)
-                os.makedirs(self.cache_dir, exist_ok=True)
+            self.artwork_store.clear()
         except Exception as e:
             print(f"Error clearing icon cache: {e}")
 
+    def sync_references(self, games):
+        """
+        Keep the icons games use from being evicted from the artwork store
+
+        Args:
+            games: Game entries of the configuration
+        """
+        if self.artwork_store is None:
+            return
+        try:
+            self.artwork_store.sync_references({
+                game['path']: game.get('icon')
+                for game in games if isinstance(game, dict) and game.get('path')
+            })
+        except Exception as e:
+            print(f"Error updating artwork references: {e}")
+
     def set_api_key(self, api_key):
         """Update the SteamGridDB API key"""
         if api_key:
             if self.steamgrid is None:
-                self.steamgrid = SteamGridDB(api_key)
+                self.steamgrid = SteamGridDB(api_key, **self.client_options)
             else:
                 self.steamgrid.api_key = api_key
         else:
+            if self.steamgrid:
+                self.steamgrid.close()
             self.steamgrid = None
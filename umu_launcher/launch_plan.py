@@ -0,0 +1,207 @@
+import os
+import shlex
+import shutil
+import logging
+
+logger = logging.getLogger('umu-launcher')
+
+DEFAULT_WINEPREFIX = os.path.expanduser('~/.wine')
+DEFAULT_PROTONPATH = os.path.expanduser('~/.local/share/Steam/compatibilitytools.d/UMU-Latest')
+
+class LaunchPlanError(Exception):
+    """Raised when a game cannot be launched with its current configuration"""
+
+def merge_game_flags(config, game_path):
+    """
+    Get the launch flags of a game
+
+    Args:
+        config: Launcher configuration
+        game_path: Path of the game executable
+
+    Returns:
+        dict: Global flags overridden by the game's own flags
+    """
+    flags = config.get('flags', {}).copy()  # Start with global settings as defaults
+    for game_config in config.get('games', []):
+        if isinstance(game_config, dict) and game_config.get('path') == game_path:
+            # Override with game-specific settings if they exist
+            flags.update(game_config.get('flags', {}))
+            break
+    return flags
+
+class WrapperResolver:
+    """
+    Resolves wrapper and runner commands to absolute paths
+
+    Lookups are cached until PATH changes or one of its directories is
+    modified (a binary installed or removed), so a launch costs a handful
+    of stat() calls instead of a PATH walk per wrapper.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self._cache_key = None
+
+    def _current_key(self):
+        path = os.environ.get('PATH', os.defpath)
+        mtimes = []
+        for directory in path.split(os.pathsep):
+            try:
+                mtimes.append(os.stat(directory or '.').st_mtime_ns)
+            except OSError:
+                mtimes.append(None)
+        return path, tuple(mtimes)
+
+    def resolve(self, command):
+        """
+        Resolve a command name or path
+
+        Returns:
+            str: Absolute path of the executable, or None if not found
+        """
+        # Explicit paths are not looked up in PATH, just checked
+        if os.sep in command:
+            path = os.path.abspath(os.path.expanduser(command))
+            return path if os.path.isfile(path) and os.access(path, os.X_OK) else None
+
+        key = self._current_key()
+        if key != self._cache_key:
+            self._cache = {}
+            self._cache_key = key
+        if command not in self._cache:
+            self._cache[command] = shutil.which(command, path=key[0])
+        return self._cache[command]
+
+_default_resolver = WrapperResolver()
+
+class LaunchPlan:
+    """Everything needed to spawn a game, computed without spawning it"""
+
+    def __init__(self, argv, env, cwd, wineprefix, protonpath):
+        self.argv = argv
+        self.env = env
+        self.cwd = cwd
+        self.wineprefix = wineprefix
+        self.protonpath = protonpath
+
+    def to_dict(self):
+        """Serializable form of the plan"""
+        return {
+            'argv': list(self.argv),
+            'env': dict(self.env),
+            'cwd': self.cwd,
+            'wineprefix': self.wineprefix,
+            'protonpath': self.protonpath
+        }
+
+class LaunchPlanner:
+    """Builds and validates the argv and environment of a game launch"""
+
+    def __init__(self, umu_run_command='umu-run', resolver=None):
+        """
+        Args:
+            umu_run_command: Command used to run umu-run (may include arguments)
+            resolver: WrapperResolver to use (shared default if None)
+        """
+        self.umu_run_command = umu_run_command or 'umu-run'
+        self.resolver = resolver or _default_resolver
+
+    def build_command(self, game_path, flags):
+        """
+        Build the argv for a game, with wrappers resolved to absolute paths
+
+        Raises:
+            LaunchPlanError: If a wrapper or umu-run cannot be found
+        """
+        command = []
+        missing = []
+
+        # Add gamemoderun and mangohud if enabled
+        for flag, wrapper in (('gamemode', 'gamemoderun'), ('mangohud', 'mangohud')):
+            if flags.get(flag, False):
+                path = self.resolver.resolve(wrapper)
+                if path:
+                    command.append(path)
+                else:
+                    missing.append(wrapper)
+
+        # Add umu-run, honoring umu_run_command from the config
+        try:
+            runner = shlex.split(self.umu_run_command)
+        except ValueError as e:
+            raise LaunchPlanError(f"Invalid umu_run_command {self.umu_run_command!r}: {e}")
+        if not runner:
+            runner = ['umu-run']
+        path = self.resolver.resolve(runner[0])
+        if path:
+            command.append(path)
+            command.extend(runner[1:])
+        else:
+            missing.append(runner[0])
+
+        if missing:
+            raise LaunchPlanError(f"Required launch command(s) not found: {', '.join(missing)}")
+
+        # Add the game path
+        command.append(game_path)
+
+        # Add additional flags if any
+        additional_flags = flags.get('additional_flags', '').strip()
+        if additional_flags:
+            command.extend(additional_flags.split())
+
+        return command
+
+    def build_env(self, flags, base_env=None):
+        """
+        Build the launch environment and validate WINEPREFIX and PROTONPATH
+
+        Returns:
+            tuple: (env, wineprefix, protonpath)
+
+        Raises:
+            LaunchPlanError: If PROTONPATH or WINEPREFIX are unusable
+        """
+        env = dict(os.environ if base_env is None else base_env)
+
+        # Set GAMEID from game-specific config, fallback to default
+        env['GAMEID'] = flags.get('gameid', 'umu-dauntless').strip()
+
+        # Set STORE type (default to egs)
+        env['STORE'] = flags.get('store', 'egs').strip()
+
+        # Use configured wine prefix and proton path, ensure they're never empty
+        wineprefix = os.path.expanduser(flags.get('wineprefix', '').strip() or DEFAULT_WINEPREFIX)
+        protonpath = os.path.expanduser(flags.get('protonpath', '').strip() or DEFAULT_PROTONPATH)
+
+        if not os.path.isdir(protonpath):
+            raise LaunchPlanError(f"PROTONPATH directory does not exist: {protonpath}")
+        if not os.path.isfile(os.path.join(protonpath, 'proton')):
+            raise LaunchPlanError(f"PROTONPATH does not contain a Proton build: {protonpath}")
+
+        # umu-run creates a missing prefix, but it needs somewhere to put it
+        if os.path.exists(wineprefix):
+            if not os.path.isdir(wineprefix):
+                raise LaunchPlanError(f"WINEPREFIX is not a directory: {wineprefix}")
+            if not os.access(wineprefix, os.W_OK):
+                raise LaunchPlanError(f"WINEPREFIX is not writable: {wineprefix}")
+        else:
+            parent = os.path.dirname(os.path.abspath(wineprefix))
+            if not os.path.isdir(parent) or not os.access(parent, os.W_OK):
+                raise LaunchPlanError(f"Cannot create WINEPREFIX, parent directory is missing or not writable: {parent}")
+
+        env['WINEPREFIX'] = wineprefix
+        env['PROTONPATH'] = protonpath
+        return env, wineprefix, protonpath
+
+    def plan(self, game_path, flags, base_env=None):
+        """
+        Build the complete launch plan for a game without spawning anything
+
+        Raises:
+            LaunchPlanError: If the game cannot be launched as configured
+        """
+        argv = self.build_command(game_path, flags)
+        env, wineprefix, protonpath = self.build_env(flags, base_env)
+        return LaunchPlan(argv, env, os.path.dirname(game_path), wineprefix, protonpath)
@@ -0,0 +1,159 @@
+import os
+import logging
+from collections import deque
+from gi.repository import GLib
+
+logger = logging.getLogger('umu-launcher')
+
+def is_prefix_initialized(prefix):
+    """Check whether a WINEPREFIX has already been set up by Wine/Proton"""
+    return (os.path.isfile(os.path.join(prefix, 'system.reg')) or
+            os.path.isfile(os.path.join(prefix, 'pfx', 'system.reg')))
+
+class LaunchTicket:
+    """A launch request waiting for or holding a scheduler slot"""
+
+    def __init__(self, game, prefix):
+        self.game = game
+        self.prefix = os.path.realpath(os.path.expanduser(prefix))
+        self.bootstrap = not is_prefix_initialized(self.prefix)
+        self.timeout_id = None
+
+class LaunchScheduler:
+    """
+    Queue in front of GameList.launch_game
+
+    Only one launch per WINEPREFIX is in flight at a time, so wineserver
+    startup and prefix upgrades never race. Launches that have to create
+    a new prefix are additionally capped, as are launches overall. A launch
+    holds its slot until release() is called (the game's executable came
+    up, the process exited or the launch failed) or settle_timeout expires.
+    """
+
+    def __init__(self, start_launch, max_concurrent=2, max_bootstraps=1,
+                 settle_timeout=120, on_state_changed=None):
+        """
+        Args:
+            start_launch: Called with a game to actually launch it, returns True on success
+            max_concurrent: Maximum number of launches in flight
+            max_bootstraps: Maximum number of launches creating a new prefix
+            settle_timeout: Seconds after which a launch releases its slot anyway
+            on_state_changed: Called with a game whenever it is queued or dequeued
+        """
+        self.start_launch = start_launch
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_bootstraps = max(1, max_bootstraps)
+        self.settle_timeout = settle_timeout
+        self.on_state_changed = on_state_changed
+
+        self.queue = deque()
+        self.active = {}  # prefix -> LaunchTicket
+
+    def _find_queued(self, game):
+        for ticket in self.queue:
+            if ticket.game is game:
+                return ticket
+        return None
+
+    def _find_active(self, game):
+        for ticket in self.active.values():
+            if ticket.game is game:
+                return ticket
+        return None
+
+    def is_queued(self, game):
+        """Check whether a game is waiting for a launch slot"""
+        return self._find_queued(game) is not None
+
+    def is_launching(self, game):
+        """Check whether a game holds a launch slot"""
+        return self._find_active(game) is not None
+
+    def submit(self, game, prefix):
+        """
+        Request a launch
+
+        Args:
+            game: GameInfo to launch
+            prefix: WINEPREFIX the game will use
+
+        Returns:
+            bool: False if the game is already queued or launching
+        """
+        if self.is_queued(game) or self.is_launching(game):
+            logger.info(f"Ignoring duplicate launch request for {game.name}")
+            return False
+
+        ticket = LaunchTicket(game, prefix)
+        self.queue.append(ticket)
+        logger.debug(f"Queued launch of {game.name} (prefix {ticket.prefix}, bootstrap: {ticket.bootstrap})")
+        self._pump()
+        if ticket in self.queue:
+            logger.info(f"Launch of {game.name} queued behind another launch")
+            self._notify(game)
+        return True
+
+    def cancel(self, game):
+        """
+        Remove a queued launch
+
+        Returns:
+            bool: True if the game was queued
+        """
+        ticket = self._find_queued(game)
+        if ticket is None:
+            return False
+        self.queue.remove(ticket)
+        self._notify(game)
+        return True
+
+    def release(self, game):
+        """Free the launch slot held by a game and start queued launches"""
+        ticket = self._find_active(game)
+        if ticket is None:
+            return False
+        del self.active[ticket.prefix]
+        if ticket.timeout_id:
+            GLib.source_remove(ticket.timeout_id)
+            ticket.timeout_id = None
+        self._pump()
+        return False  # Usable as a one-shot GLib callback
+
+    def _on_settle_timeout(self, ticket):
+        logger.warning(f"Launch of {ticket.game.name} did not settle within {self.settle_timeout}s, releasing its slot")
+        ticket.timeout_id = None
+        self.release(ticket.game)
+        return False
+
+    def _can_start(self, ticket):
+        if ticket.prefix in self.active or len(self.active) >= self.max_concurrent:
+            return False
+        if ticket.bootstrap:
+            bootstraps = sum(1 for t in self.active.values() if t.bootstrap)
+            return bootstraps < self.max_bootstraps
+        return True
+
+    def _pump(self):
+        """Start every queued launch whose prefix and slot limits allow it"""
+        for ticket in list(self.queue):
+            if not self._can_start(ticket):
+                continue
+
+            self.queue.remove(ticket)
+            self.active[ticket.prefix] = ticket
+            ticket.timeout_id = GLib.timeout_add_seconds(self.settle_timeout, self._on_settle_timeout, ticket)
+            self._notify(ticket.game)
+
+            try:
+                started = self.start_launch(ticket.game)
+            except Exception as e:
+                logger.error(f"Error starting launch of {ticket.game.name}: {e}")
+                started = False
+            if not started:
+                self.release(ticket.game)
+                # release() already pumped the rest of the queue
+                return
+
+    def _notify(self, game):
+        if self.on_state_changed:
+            self.on_state_changed(game)
@@ -0,0 +1,294 @@
+import os
+import re
+import json
+import time
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger('umu-launcher')
+
+LAUNCH_TIMES_FILE = os.path.expanduser('~/.local/state/umu-launcher/launch-times.jsonl')
+
+# Traces kept per game once the timings file grows past LAUNCH_TIMES_MAX_BYTES
+LAUNCH_TIMES_PER_GAME = 50
+LAUNCH_TIMES_MAX_BYTES = 1024 * 1024
+
+# Traces finish on watcher threads, don't let two of them rewrite the file at once
+_save_lock = threading.Lock()
+
+def _read_proc_stat(pid):
+    """Return (comm, ppid, session) for a pid from /proc, or None"""
+    try:
+        with open(f'/proc/{pid}/stat', 'r') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces and parentheses, so split on the last ')'
+    start = stat.find('(')
+    end = stat.rfind(')')
+    if start < 0 or end < 0:
+        return None
+    fields = stat[end + 2:].split()
+    try:
+        return stat[start + 1:end], int(fields[1]), int(fields[3])
+    except (IndexError, ValueError):
+        return None
+
+def _read_argv0(pid):
+    """Return the basename of argv[0] for a pid, handling Windows paths"""
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            argv0 = f.read().split(b'\0', 1)[0].decode('utf-8', 'replace')
+    except OSError:
+        return ''
+    return argv0.replace('\\', '/').rsplit('/', 1)[-1]
+
+def find_exe_processes(root_pid):
+    """
+    Find Windows processes started by a launch
+
+    A process belongs to the launch if it is a descendant of root_pid or
+    shares its session (the launcher starts games in a new session).
+
+    Args:
+        root_pid: PID of the process started by the launcher
+
+    Returns:
+        list: (pid, name) tuples whose comm or argv[0] ends with .exe
+    """
+    procs = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            info = _read_proc_stat(int(entry))
+            if info:
+                procs[int(entry)] = info
+
+    found = []
+    for pid, (comm, ppid, session) in procs.items():
+        belongs = session == root_pid
+        ancestor = ppid
+        while not belongs and ancestor > 1 and ancestor in procs:
+            belongs = ancestor == root_pid
+            ancestor = procs[ancestor][1]
+        if not belongs:
+            continue
+
+        # comm is truncated to 15 characters, argv[0] is not
+        name = comm if comm.lower().endswith('.exe') else _read_argv0(pid)
+        if name.lower().endswith('.exe'):
+            found.append((pid, name))
+    return sorted(found)
+
+class LaunchTrace:
+    """Monotonic timing spans and milestones for a single game launch"""
+
+    # First output line that comes from umu-run itself
+    UMU_PATTERN = re.compile(r'\bumu\b|umu-run|umu_run', re.IGNORECASE)
+    # First output line that comes from Proton (proton script, protonfixes)
+    PROTON_PATTERN = re.compile(r'proton', re.IGNORECASE)
+
+    # Order in which timings are reported
+    SPANS = ('config', 'command_build', 'env_build', 'popen')
+    MARKS = ('first_output', 'first_umu_line', 'first_proton_line', 'first_exe', 'game_exe')
+
+    def __init__(self, game_name, game_path):
+        """
+        Start tracing a launch
+
+        Args:
+            game_name: Display name of the game
+            game_path: Path to the game executable
+        """
+        self.game_name = game_name
+        self.game_path = game_path
+        self.wall_time = time.time()
+        self.start = time.monotonic()
+        self.spans = {}
+        self.marks = {}
+        self.details = {}
+        self.tags = {}  # Launch conditions, e.g. whether the prefix was pre-warmed
+        self.finished = False
+        self._lock = threading.Lock()
+
+    def elapsed(self):
+        """Seconds since the launch was requested"""
+        return time.monotonic() - self.start
+
+    @contextmanager
+    def span(self, name):
+        """Time a named phase of the launch"""
+        begin = self.elapsed()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.spans[name] = (begin, self.elapsed())
+
+    def mark(self, name, detail=None):
+        """
+        Record the first time a milestone is reached
+
+        Returns:
+            bool: True if this call recorded the milestone
+        """
+        with self._lock:
+            if self.finished or name in self.marks:
+                return False
+            self.marks[name] = self.elapsed()
+            if detail:
+                self.details[name] = detail
+            return True
+
+    def observe_output(self, line):
+        """Check a line of game output for launch milestones"""
+        if 'first_output' in self.marks and 'first_umu_line' in self.marks and 'first_proton_line' in self.marks:
+            return
+        self.mark('first_output')
+        if self.UMU_PATTERN.search(line):
+            self.mark('first_umu_line', line.strip()[:120])
+        if self.PROTON_PATTERN.search(line):
+            self.mark('first_proton_line', line.strip()[:120])
+
+    def watch_process(self, process, on_finish=None, interval=0.05, timeout=180):
+        """
+        Poll the process tree for the first .exe process in a background thread
+
+        The trace is finished once the game's own executable shows up, the
+        launch process exits or the timeout expires.
+
+        Args:
+            process: subprocess.Popen of the launch
+            on_finish: Called with this trace when it finishes (from the watcher thread)
+            interval: Polling interval in seconds
+            timeout: Give up after this many seconds
+        """
+        game_exe = os.path.basename(self.game_path).lower()
+
+        def watch():
+            deadline = time.monotonic() + timeout
+            try:
+                while time.monotonic() < deadline and not self.finished:
+                    for pid, name in find_exe_processes(process.pid):
+                        self.mark('first_exe', f"{name} (pid {pid})")
+                        # comm is truncated to 15 characters
+                        if name.lower() == game_exe or (len(name) == 15 and game_exe.startswith(name.lower())):
+                            self.mark('game_exe', f"{name} (pid {pid})")
+                    if 'game_exe' in self.marks or process.poll() is not None:
+                        break
+                    time.sleep(interval)
+            except Exception as e:
+                logger.error(f"Error watching launch process tree: {e}")
+            if self.finish() and on_finish:
+                on_finish(self)
+
+        threading.Thread(target=watch, daemon=True).start()
+
+    def finish(self):
+        """
+        Stop recording and save the timings
+
+        Returns:
+            bool: True if this call finished the trace
+        """
+        with self._lock:
+            if self.finished:
+                return False
+            self.finished = True
+        try:
+            self.save()
+        except Exception as e:
+            logger.error(f"Error saving launch timings: {e}")
+        return True
+
+    def to_dict(self):
+        """Serializable form of the trace"""
+        return {
+            'game': self.game_name,
+            'path': self.game_path,
+            'time': self.wall_time,
+            'spans': {name: round(end - begin, 4) for name, (begin, end) in self.spans.items()},
+            'marks': {name: round(offset, 4) for name, offset in self.marks.items()},
+            'details': self.details,
+            'tags': self.tags
+        }
+
+    def save(self, path=LAUNCH_TIMES_FILE):
+        """Append the trace to the launch timings file, trimming it when it grows too large"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _save_lock:
+            with open(path, 'a') as f:
+                f.write(json.dumps(self.to_dict()) + '\n')
+            if os.path.getsize(path) > LAUNCH_TIMES_MAX_BYTES:
+                trim_launch_times(path)
+
+    def format_summary(self, previous=None):
+        """
+        Format the trace for the log window
+
+        Args:
+            previous: Earlier traces of the same game for comparison
+        """
+        lines = [f"=== Launch timings for {self.game_name} ==="]
+        for name, value in sorted(self.tags.items()):
+            lines.append(f"  {name:<18} {value}")
+        for name in self.SPANS:
+            if name in self.spans:
+                begin, end = self.spans[name]
+                lines.append(f"  {name:<18} {(end - begin) * 1000:9.1f} ms")
+        for name in self.MARKS:
+            if name in self.marks:
+                line = f"  {name:<18} {self.marks[name]:9.3f} s"
+                if name in self.details:
+                    line += f"  {self.details[name]}"
+                lines.append(line)
+            else:
+                lines.append(f"  {name:<18}       n/a")
+
+        # Compare the time to the game's executable with earlier launches
+        # made under the same conditions
+        if previous and 'game_exe' in self.marks:
+            earlier = sorted(t['marks']['game_exe'] for t in previous
+                             if 'game_exe' in t.get('marks', {}) and t.get('tags', {}) == self.tags)
+            if earlier:
+                median = earlier[len(earlier) // 2]
+                lines.append(f"  median game_exe over last {len(earlier)} launches: {median:.3f} s")
+        return '\n'.join(lines) + '\n'
+
+def load_launch_times(game_path=None, limit=20, path=LAUNCH_TIMES_FILE):
+    """
+    Load saved launch traces, newest last
+
+    Args:
+        game_path: Only return traces for this game
+        limit: Maximum number of traces to return
+    """
+    traces = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    trace = json.loads(line)
+                except ValueError:
+                    continue
+                if game_path is None or trace.get('path') == game_path:
+                    traces.append(trace)
+    except FileNotFoundError:
+        return []
+    return traces[-limit:] if limit else traces
+
+def trim_launch_times(path=LAUNCH_TIMES_FILE, per_game=LAUNCH_TIMES_PER_GAME):
+    """Rewrite the launch timings file with only the newest traces of each game"""
+    traces = load_launch_times(limit=None, path=path)
+    counts = {}
+    kept = []
+    for trace in reversed(traces):
+        game_path = trace.get('path')
+        counts[game_path] = counts.get(game_path, 0) + 1
+        if counts[game_path] <= per_game:
+            kept.append(trace)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        for trace in reversed(kept):
+            f.write(json.dumps(trace) + '\n')
+    os.replace(tmp_path, path)
@@ -0,0 +1,196 @@
+import os
+import mmap
+import gzip
+import lzma
+import shutil
+import tempfile
+import threading
+import logging
+from array import array
+from itertools import accumulate, repeat
+from operator import add
+
+logger = logging.getLogger('umu-launcher')
+
+# Openers of compressed session logs, these are decompressed before indexing
+DECOMPRESSORS = {
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+}
+
+class LineIndex:
+    """
+    Line offset index over a memory-mapped log file
+
+    Only newline offsets are kept in memory (8 bytes per line); line text
+    is decoded from the mapping on demand. The index is extended in chunks
+    so a file that is still being written can be followed without reading
+    it again from the start.
+    """
+
+    # Bytes scanned per refresh step
+    CHUNK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, path):
+        """
+        Open a log file for indexing
+
+        Compressed logs (.gz, .xz) are decompressed to a temporary file first.
+
+        Args:
+            path: Path of the log file
+        """
+        self.path = path
+        self._temp_path = None
+        source = path
+        extension = os.path.splitext(path)[1]
+        if extension in DECOMPRESSORS:
+            source = self._decompress(path, DECOMPRESSORS[extension])
+
+        self._fd = os.open(source, os.O_RDONLY)
+        self._map = None
+        self._size = 0
+        self._lock = threading.RLock()
+        # Start offset of every line, the last one is where the next line starts
+        self.offsets = array('Q', [0])
+        self.indexed = 0  # Bytes scanned for newlines
+
+    def _decompress(self, path, opener):
+        """Decompress a log into a temporary file and return its path"""
+        fd, self._temp_path = tempfile.mkstemp(prefix='umu-log-', suffix='.log')
+        with opener(path, 'rb') as source, os.fdopen(fd, 'wb') as dest:
+            shutil.copyfileobj(source, dest, 1024 * 1024)
+        return self._temp_path
+
+    def __len__(self):
+        return self.line_count
+
+    @property
+    def line_count(self):
+        """Number of lines indexed so far (a trailing partial line counts)"""
+        with self._lock:
+            count = len(self.offsets) - 1
+            if self.offsets[-1] < self.indexed:
+                count += 1
+            return count
+
+    @property
+    def complete_line_count(self):
+        """Number of lines indexed so far that end with a newline"""
+        with self._lock:
+            return len(self.offsets) - 1
+
+    def read_lines(self, start, end):
+        """Raw bytes of complete lines start..end-1, newlines included"""
+        with self._lock:
+            end = min(end, len(self.offsets) - 1)
+            if self._map is None or end <= start:
+                return b''
+            return self._map[self.offsets[start]:self.offsets[end]]
+
+    @property
+    def complete(self):
+        """True if everything currently in the file has been indexed"""
+        return self.indexed >= self._size
+
+    def _remap(self):
+        """Map the file again if it grew, returns False if it shrank"""
+        size = os.fstat(self._fd).st_size
+        if size < self._size:
+            return False
+        if size > self._size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._fd, size, access=mmap.ACCESS_READ)
+            self._size = size
+        return True
+
+    def refresh(self, max_bytes=None):
+        """
+        Extend the index with data appended to the file
+
+        Args:
+            max_bytes: Scan at most this many bytes (None to scan to the end)
+
+        Returns:
+            int: Number of lines added to the count (negative if the file
+                 was truncated and the index started over)
+        """
+        with self._lock:
+            before = self.line_count
+            if not self._remap():
+                # Truncated or rotated in place, start over
+                if self._map is not None:
+                    self._map.close()
+                    self._map = None
+                self._size = 0
+                self.offsets = array('Q', [0])
+                self.indexed = 0
+                self._remap()
+                self.refresh(max_bytes)
+                return self.line_count - before
+
+            end = self._size if max_bytes is None else min(self._size, self.indexed + max_bytes)
+            while self.indexed < end:
+                chunk_end = min(end, self.indexed + self.CHUNK_SIZE)
+                chunk = self._map[self.indexed:chunk_end]
+                last_newline = chunk.rfind(b'\n')
+                if last_newline < 0:
+                    # No newline yet, the rest is a partial line
+                    self.indexed = chunk_end
+                    continue
+                # Newline positions from the lengths of the pieces between
+                # them, summed at C level instead of a find() per line
+                pieces = chunk[:last_newline + 1].split(b'\n')[:-1]
+                positions = accumulate(map(add, map(len, pieces), repeat(1)), initial=self.indexed)
+                next(positions)
+                self.offsets.extend(positions)
+                self.indexed = chunk_end
+            return self.line_count - before
+
+    def line_range(self, line):
+        """Byte range (start, end) of a line without its newline"""
+        with self._lock:
+            start = self.offsets[line]
+            if line + 1 < len(self.offsets):
+                end = self.offsets[line + 1] - 1
+            else:
+                end = self.indexed
+            return start, end
+
+    def get_line(self, line):
+        """
+        Get the text of a line
+
+        Args:
+            line: Zero-based line number
+
+        Returns:
+            str: Decoded line without its newline
+        """
+        with self._lock:
+            start, end = self.line_range(line)
+            data = self._map[start:end] if self._map is not None else b''
+        if data.endswith(b'\r'):
+            data = data[:-1]
+        return data.decode('utf-8', 'replace')
+
+    def lines(self, start, end):
+        """Text of lines start..end-1"""
+        return [self.get_line(line) for line in range(start, min(end, self.line_count))]
+
+    def close(self):
+        """Release the mapping and any temporary decompressed file"""
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+        if self._temp_path:
+            try:
+                os.remove(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
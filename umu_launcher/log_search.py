@@ -0,0 +1,220 @@
+import re
+import threading
+import logging
+from array import array
+from itertools import compress
+
+logger = logging.getLogger('umu-launcher')
+
+# Line classes, the position is the code stored in the class index
+LINE_LEVELS = ('other', 'err', 'warn', 'fixme', 'trace', 'stderr')
+LEVEL_CODES = {level: code for code, level in enumerate(LINE_LEVELS)}
+
+# Prefix the launcher puts in front of stderr lines
+STDERR_PREFIX = 'ERROR: '
+
+# Wine debug output, e.g. "0024:err:module:import_dll ...", optionally with
+# a timestamp and thread id ("1234.567:0024:0028:fixme:d3d:...")
+WINE_DEBUG_PATTERN = r'(?:[0-9a-f.]{1,16}:){0,3}(err|warn|fixme|trace):([\w-]*):'
+_wine_debug = re.compile(WINE_DEBUG_PATTERN)
+_wine_debug_bytes = re.compile(WINE_DEBUG_PATTERN.encode())
+_stderr_prefix_bytes = STDERR_PREFIX.encode()
+_level_codes_bytes = {level.encode(): code for level, code in LEVEL_CODES.items()}
+
+def classify_line(text):
+    """
+    Classify a line of game output
+
+    Args:
+        text: Line of output, with or without the stderr prefix
+
+    Returns:
+        tuple: (level, channel), level being one of LINE_LEVELS and channel
+               the Wine debug channel or None
+    """
+    stderr = text.startswith(STDERR_PREFIX)
+    if stderr:
+        text = text[len(STDERR_PREFIX):]
+    match = _wine_debug.match(text)
+    if match:
+        return match.group(1), match.group(2) or None
+    return ('stderr' if stderr else 'other'), None
+
+def compile_search(text, case_sensitive=False):
+    """
+    Compile search text into a pattern
+
+    Text that is a valid regular expression is used as one, anything else
+    is searched for literally.
+
+    Returns:
+        Pattern: Compiled pattern, or None for empty text
+    """
+    if not text:
+        return None
+    flags = 0 if case_sensitive else re.IGNORECASE
+    try:
+        return re.compile(text, flags)
+    except re.error:
+        return re.compile(re.escape(text), flags)
+
+class LineClassIndex:
+    """
+    Per-line classification of a LineIndex
+
+    Keeps one level code byte per line and the line numbers of each Wine
+    debug channel, so filtering by level or channel is a couple of C-level
+    passes instead of reading the log again.
+    """
+
+    # Lines classified per update step
+    STEP = 200000
+
+    def __init__(self, line_index):
+        """
+        Args:
+            line_index: LineIndex of the log to classify
+        """
+        self.line_index = line_index
+        self.codes = bytearray()
+        self.channel_lines = {}  # channel -> array of line numbers
+        self._lock = threading.Lock()
+        # Held for a whole update, so two threads can't classify the same lines
+        self._update_lock = threading.Lock()
+
+    @property
+    def classified(self):
+        """Number of lines classified so far"""
+        return len(self.codes)
+
+    def update(self, max_lines=None):
+        """
+        Classify complete lines added to the log since the last update
+
+        Args:
+            max_lines: Classify at most this many lines (None for all)
+
+        Returns:
+            int: Number of lines classified
+        """
+        with self._update_lock:
+            return self._update(max_lines)
+
+    def _update(self, max_lines):
+        start = len(self.codes)
+        end = self.line_index.complete_line_count
+        if max_lines is not None:
+            end = min(end, start + max_lines)
+        if end <= start:
+            return 0
+
+        data = self.line_index.read_lines(start, end)
+        codes = bytearray(end - start)
+        channels = {}
+        level_codes = _level_codes_bytes
+        err_code = LEVEL_CODES['stderr']
+        match = _wine_debug_bytes.match
+        prefix = _stderr_prefix_bytes
+        prefix_len = len(prefix)
+        for offset, line in enumerate(data.split(b'\n')[:end - start], start):
+            if line.startswith(prefix):
+                result = match(line, prefix_len)
+                if not result:
+                    codes[offset - start] = err_code
+                    continue
+            else:
+                result = match(line)
+                if not result:
+                    continue
+            level, channel = result.group(1, 2)
+            codes[offset - start] = level_codes[level]
+            if channel:
+                lines = channels.get(channel)
+                if lines is None:
+                    channels[channel] = lines = []
+                lines.append(offset)
+
+        with self._lock:
+            self.codes.extend(codes)
+            for channel, lines in channels.items():
+                name = channel.decode('utf-8', 'replace')
+                self.channel_lines.setdefault(name, array('I')).extend(lines)
+        return end - start
+
+    def channels(self):
+        """Names of the Wine debug channels seen in the log"""
+        with self._lock:
+            return sorted(self.channel_lines)
+
+    def level_counts(self):
+        """Number of lines of each level"""
+        with self._lock:
+            return {level: self.codes.count(code) for level, code in LEVEL_CODES.items()}
+
+    def lines_for(self, levels, channel=None):
+        """
+        Get the line numbers of lines with one of the given levels
+
+        Args:
+            levels: Levels to include
+            channel: Only include lines of this Wine debug channel
+
+        Returns:
+            array: Matching line numbers in order
+        """
+        # One byte per level code, set for the levels to include
+        table = bytes(1 if level in levels else 0 for level in LINE_LEVELS) + bytes(256 - len(LINE_LEVELS))
+        with self._lock:
+            mask = self.codes.translate(table)
+            if channel is None:
+                return array('I', compress(range(len(mask)), mask))
+            lines = self.channel_lines.get(channel, array('I'))
+            return array('I', compress(lines, map(mask.__getitem__, lines)))
+
+def search_lines(line_index, pattern, lines, cancelled=None):
+    """
+    Get the lines that match a pattern
+
+    Args:
+        line_index: LineIndex of the log
+        pattern: Compiled pattern
+        lines: Line numbers to search
+        cancelled: Callable returning True to stop early (returns None)
+
+    Returns:
+        array: Matching line numbers in order, or None if cancelled
+    """
+    matches = array('I')
+    search = pattern.search
+    get_line = line_index.get_line
+    for count, line in enumerate(lines):
+        if cancelled and count % 10000 == 0 and cancelled():
+            return None
+        if search(get_line(line)):
+            matches.append(line)
+    return matches
+
+def find_next(line_index, pattern, lines, start, cancelled=None):
+    """
+    Find the next line matching a pattern, wrapping around
+
+    Args:
+        line_index: LineIndex of the log
+        pattern: Compiled pattern
+        lines: Sequence of line numbers being shown
+        start: Position in lines to start at
+        cancelled: Callable returning True to stop early
+
+    Returns:
+        int: Position in lines of the match, or None
+    """
+    count = len(lines)
+    search = pattern.search
+    get_line = line_index.get_line
+    for step in range(count):
+        if cancelled and step % 10000 == 0 and cancelled():
+            return None
+        position = (start + step) % count
+        if search(get_line(lines[position])):
+            return position
+    return None
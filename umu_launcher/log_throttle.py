@@ -0,0 +1,114 @@
+import re
+import time
+import threading
+from .utils import TokenBucket
+from .log_search import STDERR_PREFIX, classify_line
+
+# Wine thread/process id prefix ("0024:" or "1234.567:0024:0028:"), which
+# differs between otherwise identical lines from different threads
+_WINE_ID_PREFIX = re.compile(r'^(?:[0-9a-f.]{1,16}:){1,3}(?=(?:err|warn|fixme|trace):)')
+
+class LogThrottle:
+    """
+    Thins out game output before it reaches the log window
+
+    Consecutive repeats of a line on a stream are collapsed into a single
+    "(repeated N×)" entry, and each Wine debug channel is limited by its
+    own token bucket with a note of how many lines were suppressed. The
+    session log file gets the unfiltered output.
+    """
+
+    # Seconds between "(repeated N×)" notes while a line keeps repeating
+    REPEAT_REPORT_INTERVAL = 1.0
+
+    def __init__(self, channel_rate=100, channel_burst=500, dedup=True, clock=time.monotonic):
+        """
+        Args:
+            channel_rate: Lines per second allowed per Wine debug channel (0 for no limit)
+            channel_burst: Lines a channel may emit at once before being limited
+            dedup: Collapse consecutive repeated lines
+            clock: Monotonic clock in seconds
+        """
+        self.channel_rate = channel_rate
+        self.channel_burst = channel_burst
+        self.dedup = dedup
+        self.clock = clock
+        self.buckets = {}  # (level, channel) -> TokenBucket
+        self.suppressed = {}  # (level, channel) -> lines dropped since the last note
+        self.streams = {}  # stream -> [last line key, last line, repeat count, last report time]
+        self._lock = threading.Lock()
+
+    def process(self, line, stream=''):
+        """
+        Filter a line of output
+
+        Args:
+            line: Line of output, newline included
+            stream: Name of the stream the line came from (repeats are per stream)
+
+        Returns:
+            list: Lines to show, empty if the line was collapsed or suppressed
+        """
+        with self._lock:
+            output = []
+            if self.dedup:
+                key = self._repeat_key(line)
+                state = self.streams.get(stream)
+                if state and state[0] == key:
+                    state[2] += 1
+                    now = self.clock()
+                    if now - state[3] >= self.REPEAT_REPORT_INTERVAL:
+                        output.append(self._repeat_note(state[1], state[2]))
+                        state[2] = 0
+                        state[3] = now
+                    return output
+                if state and state[2]:
+                    output.append(self._repeat_note(state[1], state[2]))
+                self.streams[stream] = [key, line, 0, self.clock()]
+
+            if self.channel_rate:
+                level, channel = classify_line(line)
+                if channel:
+                    bucket_key = (level, channel)
+                    bucket = self.buckets.get(bucket_key)
+                    if bucket is None:
+                        bucket = TokenBucket(self.channel_rate, self.channel_burst, self.clock)
+                        self.buckets[bucket_key] = bucket
+                    if not bucket.try_acquire():
+                        self.suppressed[bucket_key] = self.suppressed.get(bucket_key, 0) + 1
+                        return output
+                    dropped = self.suppressed.pop(bucket_key, 0)
+                    if dropped:
+                        output.append(f"({dropped} {level}:{channel} lines suppressed)\n")
+
+            output.append(line)
+            return output
+
+    def flush(self, stream=''):
+        """
+        Get the notes still pending for a stream that has ended
+
+        Returns:
+            list: Repeat and suppression notes to show
+        """
+        with self._lock:
+            output = []
+            state = self.streams.pop(stream, None)
+            if state and state[2]:
+                output.append(self._repeat_note(state[1], state[2]))
+            if not self.streams:
+                # Last stream of the launch, report the remaining suppressed lines
+                for (level, channel), dropped in self.suppressed.items():
+                    output.append(f"({dropped} {level}:{channel} lines suppressed)\n")
+                self.suppressed = {}
+            return output
+
+    def _repeat_key(self, line):
+        text = line[len(STDERR_PREFIX):] if line.startswith(STDERR_PREFIX) else line
+        return _WINE_ID_PREFIX.sub('', text, count=1)
+
+    def _repeat_note(self, line, count):
+        text = line.rstrip('\n')
+        if len(text) > 80:
+            text = text[:77] + '...'
+        return f"(repeated {count}×: {text})\n"
@@ -0,0 +1,418 @@
+import gi
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk, GLib, Gio, GObject
+import os
+import threading
+import logging
+from bisect import bisect_left
+from .line_index import LineIndex
+from .log_search import LINE_LEVELS, LineClassIndex, compile_search, find_next, search_lines
+
+logger = logging.getLogger('umu-launcher')
+
+class LogLineModel(GObject.Object, Gio.ListModel):
+    """List model over a LineIndex, items are created only for visible rows"""
+
+    def __init__(self, index):
+        super().__init__()
+        self.index = index
+        self.n_items = 0
+        self.lines = None  # Line numbers shown when filtered, None for all lines
+
+    def do_get_item_type(self):
+        return Gtk.StringObject.__gtype__
+
+    def do_get_n_items(self):
+        return self.n_items
+
+    def do_get_item(self, position):
+        if position >= self.n_items:
+            return None
+        line = self.line_at(position)
+        return Gtk.StringObject.new(f"{line + 1:>8}  {self.index.get_line(line)}")
+
+    def line_at(self, position):
+        """Line number shown at a position"""
+        return self.lines[position] if self.lines is not None else position
+
+    def shown_lines(self):
+        """Sequence of the line numbers shown"""
+        return self.lines if self.lines is not None else range(self.n_items)
+
+    def set_lines(self, lines):
+        """Show only the given line numbers (None to show all lines)"""
+        old_count = self.n_items
+        self.lines = lines
+        self.n_items = len(lines) if lines is not None else self.index.line_count
+        self.items_changed(0, old_count, self.n_items)
+
+    def sync(self):
+        """Tell the view about lines added to (or removed from) the index"""
+        if self.lines is not None:
+            return  # Filtered views are rebuilt by the viewer
+        count = self.index.line_count
+        if count == self.n_items:
+            return
+        old_count = self.n_items
+        self.n_items = count
+        if count > old_count:
+            # The previous last line may have been a partial line that grew
+            start = max(0, old_count - 1)
+            self.items_changed(start, old_count - start, count - start)
+        else:
+            self.items_changed(0, old_count, count)
+
+class LogViewer(Gtk.Window):
+    """
+    Viewer for large log files
+
+    The file is memory-mapped and indexed in the background, and only the
+    rows on screen are rendered by a Gtk.ListView, so opening and jumping
+    around a log of hundreds of megabytes is instant.
+    """
+
+    # How often a growing log is checked in follow mode
+    FOLLOW_INTERVAL_MS = 500
+
+    # Lines classified per follow tick, so a burst of output can't stall the main loop
+    FOLLOW_CLASSIFY_LINES = 20000
+
+    # Bytes indexed per step before the view is updated while loading
+    INDEX_STEP = 64 * 1024 * 1024
+
+    def __init__(self, parent, path):
+        """
+        Open a log file in a viewer window
+
+        Args:
+            parent: Parent window
+            path: Path of the log file (plain, .gz or .xz)
+        """
+        super().__init__(transient_for=parent, modal=False)
+        self.path = path
+        self.set_title(os.path.basename(path))
+        self.set_default_size(1000, 600)
+        self.index = None
+        self.class_index = None
+        self.classified = False  # The loading thread has classified the whole log
+        self.model = None
+        self.selection = None
+        self.follow_source_id = None
+        self.closed = False
+        self.generation = 0  # Bumped to cancel running filter and search scans
+        self.match_position = -1
+
+        # Header with line jump and follow controls
+        header_bar = Gtk.HeaderBar()
+        self.set_titlebar(header_bar)
+
+        self.line_entry = Gtk.SpinButton.new_with_range(1, 1, 1)
+        self.line_entry.set_tooltip_text("Go to line")
+        self.line_entry.connect('activate', self.on_jump_to_line)
+        header_bar.pack_start(self.line_entry)
+
+        start_button = Gtk.Button(icon_name='go-top-symbolic', tooltip_text='Go to start')
+        start_button.connect('clicked', lambda button: self.scroll_to_line(0))
+        header_bar.pack_start(start_button)
+
+        end_button = Gtk.Button(icon_name='go-bottom-symbolic', tooltip_text='Go to end')
+        end_button.connect('clicked', lambda button: self.scroll_to_end())
+        header_bar.pack_start(end_button)
+
+        self.follow_button = Gtk.ToggleButton(label="Follow")
+        self.follow_button.set_tooltip_text("Keep reading as the log grows and stay at the end")
+        self.follow_button.connect('toggled', self.on_follow_toggled)
+        header_bar.pack_end(self.follow_button)
+
+        self.status_label = Gtk.Label(label="Indexing…")
+        self.status_label.add_css_class("dim-label")
+        header_bar.pack_end(self.status_label)
+
+        # Search and filter bar
+        filter_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        filter_box.set_margin_start(6)
+        filter_box.set_margin_end(6)
+        filter_box.set_margin_top(6)
+        filter_box.set_margin_bottom(6)
+
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Search (text or regex)")
+        self.search_entry.set_hexpand(True)
+        self.search_entry.connect('search-changed', self.on_search_changed)
+        self.search_entry.connect('activate', self.on_find_next)
+        self.search_entry.connect('next-match', self.on_find_next)
+        filter_box.append(self.search_entry)
+
+        self.filter_button = Gtk.ToggleButton(label="Only Matches")
+        self.filter_button.set_tooltip_text("Show only lines matching the search")
+        self.filter_button.connect('toggled', lambda button: self.refilter())
+        filter_box.append(self.filter_button)
+
+        self.channel_entry = Gtk.Entry()
+        self.channel_entry.set_placeholder_text("Channel")
+        self.channel_entry.set_tooltip_text("Only show lines of this Wine debug channel")
+        self.channel_entry.set_width_chars(10)
+        self.channel_entry.connect('changed', lambda entry: self.refilter())
+        filter_box.append(self.channel_entry)
+
+        # One toggle per line level, all shown by default
+        level_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        level_box.add_css_class("linked")
+        self.level_buttons = {}
+        for level in LINE_LEVELS:
+            button = Gtk.ToggleButton(label=level)
+            button.set_active(True)
+            button.set_sensitive(False)  # Enabled once the log is classified
+            button.connect('toggled', lambda button: self.refilter())
+            level_box.append(button)
+            self.level_buttons[level] = button
+        filter_box.append(level_box)
+
+        # Recycled rows, one label per visible line
+        factory = Gtk.SignalListItemFactory()
+        factory.connect('setup', self.on_setup_row)
+        factory.connect('bind', self.on_bind_row)
+
+        self.list_view = Gtk.ListView(factory=factory)
+        self.list_view.add_css_class("monospace")
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_child(self.list_view)
+        self.scrolled = scrolled
+
+        main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        main_box.append(filter_box)
+        main_box.append(scrolled)
+        self.set_child(main_box)
+
+        self.connect('close-request', self.on_close_request)
+
+        # Map and index the file off the main thread
+        threading.Thread(target=self.load, daemon=True).start()
+
+    def load(self):
+        """Open and index the log in steps, updating the view after each"""
+        try:
+            index = LineIndex(self.path)
+        except Exception as e:
+            logger.error(f"Error opening log {self.path}: {e}")
+            GLib.idle_add(self.status_label.set_text, f"Error: {e}")
+            return
+        class_index = LineClassIndex(index)
+        GLib.idle_add(self.on_index_opened, index, class_index)
+        try:
+            while not self.closed:
+                index.refresh(self.INDEX_STEP)
+                GLib.idle_add(self.update_view)
+                if index.complete:
+                    break
+            # Classify lines for the level and channel filters
+            while not self.closed and class_index.update(LineClassIndex.STEP):
+                pass
+            GLib.idle_add(self.on_classified)
+        except Exception as e:
+            logger.error(f"Error indexing log {self.path}: {e}")
+
+    def on_index_opened(self, index, class_index):
+        if self.closed:
+            index.close()
+            return False
+        self.index = index
+        self.class_index = class_index
+        self.model = LogLineModel(index)
+        self.selection = Gtk.SingleSelection.new(self.model)
+        self.selection.set_autoselect(False)
+        self.selection.set_can_unselect(True)
+        self.list_view.set_model(self.selection)
+        return False
+
+    def on_classified(self):
+        """Enable the level filters once every line has a class"""
+        if self.closed:
+            return False
+        self.classified = True
+        for button in self.level_buttons.values():
+            button.set_sensitive(True)
+        if self.filters_active():
+            self.refilter()
+        return False
+
+    def update_view(self):
+        """Sync the model with the index (main thread)"""
+        if not self.model or self.closed:
+            return False
+        self.model.sync()
+        count = self.model.n_items
+        self.line_entry.set_range(1, max(1, self.index.line_count))
+        state = "" if self.index.complete else " (indexing…)"
+        if self.model.lines is not None:
+            self.status_label.set_text(f"{count:,} of {self.index.line_count:,} lines{state}")
+        else:
+            self.status_label.set_text(f"{count:,} lines{state}")
+        if self.follow_button.get_active():
+            self.scroll_to_end()
+        return False
+
+    def on_setup_row(self, factory, list_item):
+        label = Gtk.Label(xalign=0)
+        label.set_selectable(False)
+        label.set_single_line_mode(True)
+        list_item.set_child(label)
+
+    def on_bind_row(self, factory, list_item):
+        list_item.get_child().set_text(list_item.get_item().get_string())
+
+    def scroll_to_line(self, line):
+        """Scroll so a zero-based line is visible"""
+        if not self.model or not self.model.n_items:
+            return
+        line = max(0, min(line, self.model.n_items - 1))
+        if hasattr(self.list_view, 'scroll_to'):
+            self.list_view.scroll_to(line, Gtk.ListScrollFlags.NONE, None)
+        else:
+            # Before GTK 4.12 rows have a fixed height here, so scroll by ratio
+            adjustment = self.scrolled.get_vadjustment()
+            ratio = line / self.model.n_items
+            adjustment.set_value(ratio * (adjustment.get_upper() - adjustment.get_page_size()))
+
+    def scroll_to_end(self):
+        if self.model:
+            self.scroll_to_line(self.model.n_items - 1)
+
+    def on_jump_to_line(self, spin_button):
+        line = spin_button.get_value_as_int() - 1
+        if self.model and self.model.lines is not None:
+            # Go to the nearest shown line at or after it
+            line = bisect_left(self.model.lines, line)
+        self.scroll_to_line(line)
+
+    def filters_active(self):
+        """Check whether any level, channel or match filter is set"""
+        levels_hidden = not all(button.get_active() for button in self.level_buttons.values())
+        channel = self.channel_entry.get_text().strip()
+        only_matches = self.filter_button.get_active() and self.search_entry.get_text()
+        return bool(levels_hidden or channel or only_matches)
+
+    def refilter(self):
+        """Rebuild the shown lines from the filters in a background thread"""
+        if not self.model or not self.class_index:
+            return
+        self.generation += 1
+        generation = self.generation
+        if not self.filters_active():
+            self.model.set_lines(None)
+            self.update_view()
+            return
+
+        levels = {level for level, button in self.level_buttons.items() if button.get_active()}
+        channel = self.channel_entry.get_text().strip() or None
+        pattern = compile_search(self.search_entry.get_text()) if self.filter_button.get_active() else None
+        self.status_label.set_text("Filtering…")
+
+        def cancelled():
+            return generation != self.generation or self.closed
+
+        def run():
+            try:
+                lines = self.class_index.lines_for(levels, channel)
+                if pattern:
+                    lines = search_lines(self.index, pattern, lines, cancelled)
+                if lines is not None:
+                    GLib.idle_add(self.on_filtered, generation, lines)
+            except Exception as e:
+                logger.error(f"Error filtering log: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def on_filtered(self, generation, lines):
+        if generation == self.generation and not self.closed:
+            self.model.set_lines(lines)
+            self.match_position = -1
+            self.update_view()
+        return False
+
+    def on_search_changed(self, entry):
+        self.match_position = -1
+        if self.filter_button.get_active():
+            self.refilter()
+        else:
+            self.find_match(0)
+
+    def on_find_next(self, entry):
+        self.find_match(self.match_position + 1)
+
+    def find_match(self, start):
+        """Scroll to the next line matching the search from a position"""
+        pattern = compile_search(self.search_entry.get_text())
+        if not pattern or not self.model or not self.model.n_items:
+            return
+        self.generation += 1
+        generation = self.generation
+        lines = self.model.shown_lines()
+
+        def cancelled():
+            return generation != self.generation or self.closed
+
+        def run():
+            try:
+                position = find_next(self.index, pattern, lines, start % len(lines), cancelled)
+                if not cancelled():
+                    GLib.idle_add(self.on_match_found, generation, position)
+            except Exception as e:
+                logger.error(f"Error searching log: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def on_match_found(self, generation, position):
+        if generation != self.generation or self.closed:
+            return False
+        if position is None:
+            self.status_label.set_text("No matches")
+            return False
+        self.match_position = position
+        self.selection.set_selected(position)
+        self.scroll_to_line(position)
+        return False
+
+    def on_follow_toggled(self, button):
+        if button.get_active():
+            if self.follow_source_id is None:
+                self.follow_source_id = GLib.timeout_add(self.FOLLOW_INTERVAL_MS, self.on_follow_tick)
+            self.scroll_to_end()
+        elif self.follow_source_id is not None:
+            GLib.source_remove(self.follow_source_id)
+            self.follow_source_id = None
+
+    def on_follow_tick(self):
+        """Extend the index with newly written lines"""
+        if self.index and self.index.complete:
+            try:
+                added = self.index.refresh()
+                if not self.classified:
+                    # The loading thread is still classifying, it picks up new lines
+                    pass
+                elif added < 0:
+                    # The log was truncated, classify it again over the next ticks
+                    self.class_index = LineClassIndex(self.index)
+                    self.class_index.update(self.FOLLOW_CLASSIFY_LINES)
+                    self.refilter()
+                elif self.class_index.update(self.FOLLOW_CLASSIFY_LINES) and self.filters_active():
+                    self.refilter()
+            except Exception as e:
+                logger.error(f"Error following log {self.path}: {e}")
+            self.update_view()
+        return True
+
+    def on_close_request(self, window):
+        self.closed = True
+        self.generation += 1
+        if self.follow_source_id is not None:
+            GLib.source_remove(self.follow_source_id)
+            self.follow_source_id = None
+        if self.model:
+            self.list_view.set_model(None)
+        if self.index:
+            self.index.close()
+            self.index = None
+        return False
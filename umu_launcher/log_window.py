@@ -1,31 +1,27 @@
 import gi
 gi.require_version('Gtk', '4.0')
-from gi.repository import Gtk, GLib, Gdk, Gio
+from gi.repository import Gtk, GLib, Gdk, Gio, Pango
 import os
-import re
+import threading
+import logging
+from collections import OrderedDict
+from .ansi import parse_ansi, strip_control, TIMESTAMP_PATTERN
+from .game_logs import LOGS_DIR
+from .log_viewer import LogViewer
+from .log_search import LINE_LEVELS, classify_line, compile_search
+
+logger = logging.getLogger('umu-launcher')
 
 class LogWindow(Gtk.Window):
-    # ANSI color code to GTK color mapping
-    ANSI_COLORS = {
-        '30': '#000000',  # Black
-        '31': '#C62828',  # Red
-        '32': '#2E7D32',  # Green
-        '33': '#F57C00',  # Yellow
-        '34': '#1976D2',  # Blue
-        '35': '#7B1FA2',  # Magenta
-        '36': '#0097A7',  # Cyan
-        '37': '#757575',  # White
-        '90': '#616161',  # Bright Black (Gray)
-        '91': '#EF5350',  # Bright Red
-        '92': '#4CAF50',  # Bright Green
-        '93': '#FFA726',  # Bright Yellow
-        '94': '#42A5F5',  # Bright Blue
-        '95': '#AB47BC',  # Bright Magenta
-        '96': '#26C6DA',  # Bright Cyan
-        '97': '#FFFFFF',  # Bright White
-    }
+    # How often queued lines from game output are flushed into the buffer
+    FLUSH_INTERVAL_MS = 33
+    
+    # Maximum number of foreground/background color tags kept in the tag
+    # table, the least recently used one is removed when a new color shows up
+    MAX_COLOR_TAGS = 256
 
-    def __init__(self, parent, width=600, height=300, position='bottom'):
+    def __init__(self, parent, width=600, height=300, position='bottom',
+                 max_lines=5000, max_chars=4000000, max_pending=10000):
         """
         Initialize the log window
         
@@ -34,6 +30,9 @@ class LogWindow(Gtk.Window):
             width: Window width in pixels
             height: Window height in pixels
             position: Window position ('bottom', 'right', 'left')
+            max_lines: Maximum number of lines kept in the log
+            max_chars: Maximum number of characters kept in the log
+            max_pending: Maximum number of lines waiting to be flushed, more are dropped
         """
         super().__init__(
             transient_for=parent,
@@ -46,6 +45,17 @@ class LogWindow(Gtk.Window):
         self.window_height = height
         self.window_position = position
         
+        # Limits of each channel's buffer and pending queue
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self.max_pending = max_pending
+        
+        # One channel (buffer) per game plus the launcher's own, all sharing
+        # one tag table. Only the visible channel is bound to the text view
+        self.tag_table = Gtk.TextTagTable()
+        self.channels = {}
+        self.visible_channel = None
+        
         # Set window properties
         self.set_default_size(width, height)
         self.set_resizable(False)
@@ -75,22 +85,86 @@ class LogWindow(Gtk.Window):
         spacer.set_hexpand(True)
         header_box.append(spacer)
         
+        # Add button to show the search and filter bar
+        self.search_button = Gtk.ToggleButton()
+        self.search_button.set_icon_name("system-search-symbolic")
+        self.search_button.set_tooltip_text("Search and Filter")
+        self.search_button.connect("toggled", self.on_search_toggled)
+        header_box.append(self.search_button)
+        
+        # Add button to open a saved log in the large log viewer
+        open_button = Gtk.Button()
+        open_button.set_icon_name("document-open-symbolic")
+        open_button.set_tooltip_text("Open Saved Log")
+        open_button.connect("clicked", self.on_open_log_clicked)
+        header_box.append(open_button)
+        
         # Add minimize button
         minimize_button = Gtk.Button()
         minimize_button.set_icon_name("go-down-symbolic")
         minimize_button.connect("clicked", self.on_minimize_clicked)
         header_box.append(minimize_button)
         
+        # Add search and filter bar, hidden until the search button is toggled
+        self.filter_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        self.filter_box.set_visible(False)
+        
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Search (text or regex)")
+        self.search_entry.set_hexpand(True)
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        self.search_entry.connect("activate", self.on_find_next)
+        self.search_entry.connect("next-match", self.on_find_next)
+        self.filter_box.append(self.search_entry)
+        
+        self.only_matches_button = Gtk.ToggleButton(label="Only Matches")
+        self.only_matches_button.set_tooltip_text("Show only lines matching the search")
+        self.only_matches_button.connect("toggled", lambda button: self.apply_filter())
+        self.filter_box.append(self.only_matches_button)
+        
+        self.channel_entry = Gtk.Entry()
+        self.channel_entry.set_placeholder_text("Channel")
+        self.channel_entry.set_tooltip_text("Only show lines of this Wine debug channel")
+        self.channel_entry.set_width_chars(8)
+        self.channel_entry.connect("changed", lambda entry: self.apply_filter())
+        self.filter_box.append(self.channel_entry)
+        
+        # One toggle per line level, hiding a level only flips its tag
+        level_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        level_box.add_css_class("linked")
+        self.level_buttons = {}
+        for level in LINE_LEVELS:
+            button = Gtk.ToggleButton(label=level)
+            button.set_active(True)
+            button.connect("toggled", self.on_level_toggled, level)
+            level_box.append(button)
+            self.level_buttons[level] = button
+        self.filter_box.append(level_box)
+        self.main_box.append(self.filter_box)
+        
+        # Add channel tabs, shown once there is more than one channel
+        tabs_scrolled = Gtk.ScrolledWindow()
+        tabs_scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.NEVER)
+        self.tab_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        self.tab_box.add_css_class("linked")
+        tabs_scrolled.set_child(self.tab_box)
+        tabs_scrolled.set_visible(False)
+        self.tabs_scrolled = tabs_scrolled
+        self.main_box.append(tabs_scrolled)
+        
         # Add scrolled window for log
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_vexpand(True)
         
-        # Add text view for log
-        self.text_view = Gtk.TextView()
+        # Add text view for log, showing the launcher's channel first
+        self.main_channel = self.get_channel(None, "Launcher")
+        self.text_view = Gtk.TextView(buffer=self.main_channel.text_buffer)
         self.text_view.set_editable(False)
         self.text_view.set_wrap_mode(Gtk.WrapMode.WORD_CHAR)
         self.text_view.set_monospace(True)
-        self.text_buffer = self.text_view.get_buffer()
+        self.text_buffer = self.main_channel.text_buffer
+        self.visible_channel = self.main_channel
+        self.main_channel.button.set_active(True)
         
         # Create text tags for different log levels and ANSI colors
         self.text_buffer.create_tag("info", foreground="#2E7D32")  # Dark green
@@ -98,13 +172,22 @@ class LogWindow(Gtk.Window):
         self.text_buffer.create_tag("error", foreground="#C62828")  # Dark red
         self.text_buffer.create_tag("debug", foreground="#1976D2")  # Blue
         self.text_buffer.create_tag("timestamp", foreground="#616161", scale=0.9)  # Gray, slightly smaller
+        self.text_buffer.create_tag("dropped", foreground="#616161", style=Pango.Style.ITALIC)  # Trimmed lines marker
         
-        # Create tags for ANSI colors
-        for code, color in self.ANSI_COLORS.items():
-            self.text_buffer.create_tag(f"ansi_{code}", foreground=color)
-        
-        # Create tag for bold text
+        # Create tags for text attributes, color tags are created on demand
         self.text_buffer.create_tag("bold", weight=700)  # Pango.Weight.BOLD equivalent
+        self.text_buffer.create_tag("italic", style=Pango.Style.ITALIC)
+        self.text_buffer.create_tag("underline", underline=Pango.Underline.SINGLE)
+        self.color_tags = OrderedDict()
+        
+        # Create tags for line classes (made invisible to filter a level),
+        # lines hidden by the channel or search filter, and search matches
+        for level in LINE_LEVELS:
+            self.text_buffer.create_tag(f"line_{level}")
+        self.text_buffer.create_tag("filtered", invisible=True)
+        self.search_tag = self.text_buffer.create_tag("search_match", background="#FFF59D", foreground="#000000")
+        self.search_pattern = None
+        self.search_offset = 0
         
         scrolled.set_child(self.text_view)
         self.main_box.append(scrolled)
@@ -307,84 +390,504 @@ class LogWindow(Gtk.Window):
         """Handle minimize button click"""
         self.hide_with_animation()
     
-    def parse_ansi_codes(self, text):
-        """Parse ANSI escape codes and return a list of (text, tags) tuples"""
-        result = []
-        current_tags = set()
-        
-        # Regular expression for ANSI escape codes, including escape character
-        ansi_pattern = re.compile(r'(?:\x1B|\[)(?:\[[0-9;]*[@-~]|\[.*?[@-~]|[0-9;]*[mK])')
-        
-        # Split the text into parts
-        last_end = 0
-        for match in ansi_pattern.finditer(text):
-            # Add any text before the ANSI code
-            if match.start() > last_end:
-                result.append((text[last_end:match.start()], list(current_tags)))
-            
-            # Process the ANSI code
-            code = match.group()
-            if 'm' in code:  # Color/style code
-                codes = code.strip('[]m').split(';')
-                for c in codes:
-                    if c == '0' or not c:  # Reset
-                        current_tags.clear()
-                    elif c == '1':  # Bold
-                        current_tags.add('bold')
-                    elif c in self.ANSI_COLORS:  # Color code
-                        # Remove any existing color tags
-                        current_tags = {tag for tag in current_tags if not tag.startswith('ansi_')}
-                        current_tags.add(f'ansi_{c}')
-            
-            last_end = match.end()
+    def on_open_log_clicked(self, button):
+        """Choose a saved session log to open in the log viewer"""
+        dialog = Gtk.FileChooserDialog(
+            title="Open Game Log",
+            transient_for=self.get_transient_for() or self,
+            modal=True,
+            action=Gtk.FileChooserAction.OPEN
+        )
+        dialog.add_buttons(
+            "_Cancel", Gtk.ResponseType.CANCEL,
+            "_Open", Gtk.ResponseType.ACCEPT
+        )
+        
+        filter_log = Gtk.FileFilter()
+        filter_log.set_name("Log Files")
+        for pattern in ("*.log", "*.log.gz", "*.log.xz", "*.txt"):
+            filter_log.add_pattern(pattern)
+        dialog.add_filter(filter_log)
         
-        # Add any remaining text
-        if last_end < len(text):
-            result.append((text[last_end:], list(current_tags)))
+        # Start in the saved session logs
+        logs_dir = LOGS_DIR if os.path.isdir(LOGS_DIR) else os.path.expanduser("~")
+        dialog.set_current_folder(Gio.File.new_for_path(logs_dir))
+        
+        dialog.connect('response', self.on_log_file_chosen)
+        dialog.present()
+    
+    def on_log_file_chosen(self, dialog, response):
+        try:
+            if response == Gtk.ResponseType.ACCEPT:
+                self.open_log_viewer(dialog.get_file().get_path())
+        except Exception as e:
+            logger.error(f"Error opening log: {e}")
+        finally:
+            dialog.destroy()
+    
+    def open_log_viewer(self, path):
+        """Open a log file in the large log viewer"""
+        viewer = LogViewer(self.get_transient_for() or self, path)
+        viewer.present()
+        return viewer
+    
+    def color_tag(self, prop, color):
+        """
+        Get the tag for a foreground or background color, creating it if needed
         
-        return result
+        Args:
+            prop: Tag property ('foreground' or 'background')
+            color: Color as #rrggbb
+        
+        Returns:
+            str: Name of the tag
+        """
+        name = f"{prop[:2]}_{color}"
+        if name in self.color_tags:
+            self.color_tags.move_to_end(name)
+            return name
+        
+        # Evict the least recently used color, text still using it falls
+        # back to the default color
+        if len(self.color_tags) >= self.MAX_COLOR_TAGS:
+            old_name, _ = self.color_tags.popitem(last=False)
+            old_tag = self.tag_table.lookup(old_name)
+            if old_tag:
+                self.tag_table.remove(old_tag)
+        
+        self.text_buffer.create_tag(name, **{prop: color})
+        self.color_tags[name] = True
+        return name
 
-    def append_text(self, text, level="info"):
+    def style_tags(self, style):
+        """Get the tag names for a style tuple from parse_ansi"""
+        if style is None:
+            return ()
+        fg, bg, bold, italic, underline = style
+        tags = []
+        if fg:
+            tags.append(self.color_tag("foreground", fg))
+        if bg:
+            tags.append(self.color_tag("background", bg))
+        if bold:
+            tags.append("bold")
+        if italic:
+            tags.append("italic")
+        if underline:
+            tags.append("underline")
+        return tuple(tags)
+
+    def parse_ansi_codes(self, text):
+        """Parse ANSI escape codes and return a list of (text, tags) tuples"""
+        return [(part, self.style_tags(style)) for part, style in parse_ansi(text)]
+
+    def format_line(self, text, level, timestamp):
         """
-        Append text to the log with specified level
+        Split a log line into (text, tags) segments
         
         Args:
-            text: Text to append
+            text: Text of the line
             level: Log level (info, warning, error, debug)
+            timestamp: Timestamp to use if the line has none
         """
-        end_iter = self.text_buffer.get_end_iter()
+        segments = []
         
         # Clean the text of any null characters or other problematic control chars
-        text = ''.join(char for char in text if char >= ' ' or char in '\n\r\t')
+        text = strip_control(text)
         
         # Extract timestamp if present in the format [HH:MM:SS]
-        timestamp_match = re.match(r'^\[(\d{2}:\d{2}:\d{2})\]\s*', text)
+        timestamp_match = TIMESTAMP_PATTERN.match(text)
         if timestamp_match:
             timestamp = timestamp_match.group(0)
             text = text[len(timestamp):]
-            self.text_buffer.insert_with_tags_by_name(end_iter, timestamp, "timestamp")
-        else:
-            # Add current timestamp if none present
-            timestamp = GLib.DateTime.new_now_local().format("[%H:%M:%S] ")
-            self.text_buffer.insert_with_tags_by_name(end_iter, timestamp, "timestamp")
+        segments.append((timestamp, ("timestamp",)))
         
         # Parse and apply ANSI color codes
-        parts = self.parse_ansi_codes(text)
-        for text_part, tags in parts:
-            if tags:
-                self.text_buffer.insert_with_tags_by_name(end_iter, text_part, *tags)
-            else:
-                # If no ANSI tags, use the log level tag
-                if level in ["info", "warning", "error", "debug"]:
-                    self.text_buffer.insert_with_tags_by_name(end_iter, text_part, level)
-                else:
-                    self.text_buffer.insert(end_iter, text_part)
+        level_tags = (level,) if level in ("info", "warning", "error", "debug", "dropped") else ()
+        for text_part, tags in self.parse_ansi_codes(text):
+            # If no ANSI color, use the log level tag
+            if not any(tag.startswith("fo_") for tag in tags):
+                tags = tags + level_tags
+            segments.append((text_part, tags))
         
         # Add newline if not present
         if not text.endswith("\n"):
-            self.text_buffer.insert(end_iter, "\n")
+            segments.append(("\n", ()))
+        return segments
+
+    def append_text(self, text, level="info"):
+        """
+        Append text to the launcher's log with specified level (main thread only)
         
-        # Scroll to bottom
-        mark = self.text_buffer.create_mark(None, end_iter, False)
-        self.text_view.scroll_mark_onscreen(mark)
-        self.text_buffer.delete_mark(mark)
+        Args:
+            text: Text to append
+            level: Log level (info, warning, error, debug)
+        """
+        self.main_channel.append_text(text, level)
+
+    def queue_text(self, text, level="info"):
+        """
+        Queue text for the launcher's log from any thread
+        
+        Args:
+            text: Text to append
+            level: Log level (info, warning, error, debug)
+        """
+        self.main_channel.queue_text(text, level)
+
+    def get_channel(self, key, title):
+        """
+        Get the channel for a game, creating it and its tab if needed
+        
+        Args:
+            key: Key of the channel (e.g. the game's path), None for the launcher
+            title: Title of the channel's tab
+        
+        Returns:
+            LogChannel: The channel
+        """
+        channel = self.channels.get(key)
+        if channel:
+            return channel
+        
+        channel = LogChannel(self, title, self.max_lines, self.max_chars, self.max_pending)
+        channel.button = Gtk.ToggleButton(label=title)
+        if self.channels:
+            channel.button.set_group(next(iter(self.channels.values())).button)
+        channel.button.connect("toggled", self.on_tab_toggled, channel)
+        self.tab_box.append(channel.button)
+        self.channels[key] = channel
+        self.tabs_scrolled.set_visible(len(self.channels) > 1)
+        return channel
+
+    def on_tab_toggled(self, button, channel):
+        if button.get_active():
+            self.show_channel(channel)
+
+    def show_channel(self, channel):
+        """Bind a channel's buffer to the text view"""
+        if channel is self.visible_channel:
+            return
+        if not channel.button.get_active():
+            channel.button.set_active(True)  # Calls back into show_channel
+            return
+        
+        # The hidden buffer keeps its text but loses the search highlights
+        start_iter, end_iter = self.text_buffer.get_bounds()
+        self.text_buffer.remove_tag(self.search_tag, start_iter, end_iter)
+        
+        self.visible_channel = channel
+        self.text_buffer = channel.text_buffer
+        self.text_view.set_buffer(channel.text_buffer)
+        channel.set_unread(False)
+        
+        # Filters and search apply to the visible channel
+        self.search_offset = 0
+        if self.search_pattern:
+            self.highlight_matches(self.buffer_text())
+        self.apply_filter()
+        self.text_view.scroll_mark_onscreen(channel.end_mark)
+
+    def on_search_toggled(self, button):
+        """Show or hide the search and filter bar"""
+        active = button.get_active()
+        self.filter_box.set_visible(active)
+        if active:
+            self.search_entry.grab_focus()
+        else:
+            # Closing the bar clears the search and the text filters
+            self.search_entry.set_text("")
+            self.channel_entry.set_text("")
+            self.only_matches_button.set_active(False)
+    
+    def on_level_toggled(self, button, level):
+        """Hide or show every line of a level"""
+        tag = self.tag_table.lookup(f"line_{level}")
+        tag.set_property("invisible", not button.get_active())
+    
+    def line_matches_filter(self, text, channel):
+        """Check whether a line passes the channel and only-matches filters"""
+        wanted_channel = self.channel_entry.get_text().strip()
+        if wanted_channel and channel != wanted_channel:
+            return False
+        if self.only_matches_button.get_active() and self.search_pattern:
+            return bool(self.search_pattern.search(text))
+        return True
+    
+    def buffer_text(self):
+        """Whole text of the buffer, hidden lines included so offsets match"""
+        start_iter, end_iter = self.text_buffer.get_bounds()
+        return self.text_buffer.get_text(start_iter, end_iter, True)
+    
+    def apply_filter(self):
+        """Re-apply the channel and only-matches filters to the whole buffer"""
+        start_iter, end_iter = self.text_buffer.get_bounds()
+        self.text_buffer.remove_tag_by_name("filtered", start_iter, end_iter)
+        if not self.channel_entry.get_text().strip() and not (self.only_matches_button.get_active() and self.search_pattern):
+            return
+        
+        # Hide runs of consecutive non-matching lines with one tag each
+        offset = 0
+        hidden_start = None
+        for line in self.buffer_text().split("\n"):
+            text = line
+            timestamp_match = TIMESTAMP_PATTERN.match(text)
+            if timestamp_match:
+                text = text[timestamp_match.end():]
+            _, channel = classify_line(text)
+            visible = self.line_matches_filter(text, channel)
+            if not visible and hidden_start is None:
+                hidden_start = offset
+            elif visible and hidden_start is not None:
+                self.hide_range(hidden_start, offset)
+                hidden_start = None
+            offset += len(line) + 1
+        if hidden_start is not None:
+            self.hide_range(hidden_start, offset)
+    
+    def hide_range(self, start, end):
+        self.text_buffer.apply_tag_by_name(
+            "filtered",
+            self.text_buffer.get_iter_at_offset(start),
+            self.text_buffer.get_iter_at_offset(end)
+        )
+    
+    def highlight_matches(self, text, base=0):
+        """Highlight search matches in text that starts at buffer offset base"""
+        for match in self.search_pattern.finditer(text):
+            if match.end() > match.start():
+                self.text_buffer.apply_tag(
+                    self.search_tag,
+                    self.text_buffer.get_iter_at_offset(base + match.start()),
+                    self.text_buffer.get_iter_at_offset(base + match.end())
+                )
+    
+    def on_search_changed(self, entry):
+        """Highlight all matches of the search and go to the first one"""
+        start_iter, end_iter = self.text_buffer.get_bounds()
+        self.text_buffer.remove_tag(self.search_tag, start_iter, end_iter)
+        self.search_pattern = compile_search(entry.get_text())
+        self.search_offset = 0
+        if self.search_pattern:
+            # Draw matches over ANSI background colors
+            self.search_tag.set_priority(self.tag_table.get_size() - 1)
+            self.highlight_matches(self.buffer_text())
+        self.apply_filter()
+        self.on_find_next(entry)
+    
+    def on_find_next(self, entry):
+        """Select the next search match after the previous one, wrapping around"""
+        if not self.search_pattern:
+            return
+        text = self.buffer_text()
+        match = self.search_pattern.search(text, self.search_offset) or self.search_pattern.search(text)
+        if not match:
+            return
+        start_iter = self.text_buffer.get_iter_at_offset(match.start())
+        end_iter = self.text_buffer.get_iter_at_offset(match.end())
+        self.text_buffer.select_range(start_iter, end_iter)
+        self.text_view.scroll_to_iter(start_iter, 0.1, False, 0, 0)
+        self.search_offset = max(match.end(), match.start() + 1)
+
+class LogChannel:
+    """
+    Bounded log buffer of one game, or of the launcher itself
+    
+    Each channel has its own TextBuffer over the window's shared tag table.
+    Channels that aren't visible keep receiving text but are not bound to
+    the text view, so they cost no layout or rendering.
+    """
+
+    def __init__(self, window, title, max_lines=5000, max_chars=4000000, max_pending=10000):
+        """
+        Args:
+            window: LogWindow showing the channel
+            title: Title of the channel's tab
+            max_lines: Maximum number of lines kept in the buffer
+            max_chars: Maximum number of characters kept in the buffer
+            max_pending: Maximum number of lines waiting to be flushed, more are dropped
+        """
+        self.window = window
+        self.title = title
+        self.button = None  # Tab of the channel
+        self.unread = False
+        self.text_buffer = Gtk.TextBuffer(tag_table=window.tag_table)
+        
+        # Mark that always stays at the end of the log, used for scrolling
+        self.end_mark = self.text_buffer.create_mark("end", self.text_buffer.get_end_iter(), False)
+        
+        # Ring buffer limits, the oldest lines are dropped in chunks
+        self.max_lines = max(1, max_lines)
+        self.max_chars = max(1, max_chars)
+        self.trim_chunk = max(100, self.max_lines // 10)
+        self.dropped_lines = 0
+        
+        # Lines queued from reader threads, flushed in batches. The queue is
+        # bounded so a flood of output can't outrun the main loop
+        self.max_pending = max(1, max_pending)
+        self.pending_dropped = 0
+        self.pending_lines = []
+        self.pending_lock = threading.Lock()
+        self.flush_scheduled = False
+
+    def set_unread(self, unread):
+        """Mark the channel's tab when it has text that hasn't been seen"""
+        if self.button and unread != self.unread:
+            self.button.set_label(f"{self.title} •" if unread else self.title)
+        self.unread = unread
+
+    def insert_lines(self, lines):
+        """
+        Insert a batch of log lines with a single buffer insert and one scroll
+        
+        Args:
+            lines: List of (text, level) tuples
+        """
+        if not lines:
+            return
+        
+        # One timestamp for the whole batch
+        timestamp = GLib.DateTime.new_now_local().format("[%H:%M:%S] ")
+        
+        # Join the batch into one string, remembering which ranges get which
+        # tags (adjacent ranges with the same tags are merged)
+        chunks = []
+        tag_ranges = []
+        line_ranges = []
+        offset = 0
+        for text, level in lines:
+            line_start = offset
+            for segment, tags in self.window.format_line(text, level, timestamp):
+                length = len(segment)
+                if not length:
+                    continue
+                if tags:
+                    if tag_ranges and tag_ranges[-1][1] == offset and tag_ranges[-1][2] == tags:
+                        tag_ranges[-1][1] = offset + length
+                    else:
+                        tag_ranges.append([offset, offset + length, tags])
+                chunks.append(segment)
+                offset += length
+            
+            # Tag the whole line with its class and hide it if it is filtered out
+            line_text = strip_control(text)
+            timestamp_match = TIMESTAMP_PATTERN.match(line_text)
+            if timestamp_match:
+                line_text = line_text[timestamp_match.end():]
+            line_level, channel = classify_line(line_text)
+            line_tags = (f"line_{line_level}",)
+            if not self.window.line_matches_filter(text, channel):
+                line_tags += ("filtered",)
+            line_ranges.append((line_start, offset, line_tags))
+        
+        end_iter = self.text_buffer.get_end_iter()
+        base = end_iter.get_offset()
+        batch_text = ''.join(chunks)
+        self.text_buffer.insert(end_iter, batch_text)
+        for start, end, tags in tag_ranges:
+            start_iter = self.text_buffer.get_iter_at_offset(base + start)
+            end_iter = self.text_buffer.get_iter_at_offset(base + end)
+            for name in tags:
+                # Color tags from early in a large batch may have been evicted
+                tag = self.window.tag_table.lookup(name)
+                if tag:
+                    self.text_buffer.apply_tag(tag, start_iter, end_iter)
+        for start, end, tags in line_ranges:
+            start_iter = self.text_buffer.get_iter_at_offset(base + start)
+            end_iter = self.text_buffer.get_iter_at_offset(base + end)
+            for name in tags:
+                self.text_buffer.apply_tag_by_name(name, start_iter, end_iter)
+        visible = self.window.visible_channel is self
+        if visible and self.window.search_pattern:
+            self.window.highlight_matches(batch_text, base)
+        
+        # Drop the oldest lines if the log grew past its limits
+        self.trim()
+        
+        # Scroll to bottom, unless the user is looking at search results
+        if not visible:
+            self.set_unread(True)
+        elif not self.window.search_pattern:
+            self.window.text_view.scroll_mark_onscreen(self.end_mark)
+
+    def append_text(self, text, level="info"):
+        """
+        Append text to the channel with specified level (main thread only)
+        
+        Args:
+            text: Text to append
+            level: Log level (info, warning, error, debug)
+        """
+        self.insert_lines([(text, level)])
+
+    def queue_text(self, text, level="info"):
+        """
+        Queue text for the channel from any thread
+        
+        Queued lines are inserted in one batch per flush interval instead
+        of one main loop callback per line.
+        
+        Args:
+            text: Text to append
+            level: Log level (info, warning, error, debug)
+        """
+        with self.pending_lock:
+            if len(self.pending_lines) >= self.max_pending:
+                # Already a flush pending, just count what is lost
+                self.pending_dropped += 1
+                return
+            self.pending_lines.append((text, level))
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        GLib.timeout_add(LogWindow.FLUSH_INTERVAL_MS, self.flush_pending)
+
+    def flush_pending(self):
+        """Insert all queued lines (runs on the main loop)"""
+        with self.pending_lock:
+            lines = self.pending_lines
+            self.pending_lines = []
+            self.flush_scheduled = False
+            dropped = self.pending_dropped
+            self.pending_dropped = 0
+        if dropped:
+            lines.append((f"[... {dropped} lines dropped, the log window could not keep up ...]\n", "dropped"))
+        try:
+            self.insert_lines(lines)
+        except Exception as e:
+            logger.error(f"Error flushing log lines: {e}")
+        return False  # Don't repeat
+
+    def trim(self):
+        """Delete the oldest lines once the log exceeds its line or character limit"""
+        line_count = self.text_buffer.get_line_count()
+        char_count = self.text_buffer.get_char_count()
+        
+        # Only trim once a whole chunk is over the limit so that deleting
+        # from the start of the buffer doesn't happen on every insert
+        if line_count <= self.max_lines + self.trim_chunk and char_count <= self.max_chars:
+            return
+        
+        has_marker = self.dropped_lines > 0
+        delete_lines = max(0, line_count - self.max_lines)
+        if char_count > self.max_chars:
+            # Go below the character limit by a chunk's worth as well
+            keep_chars = self.max_chars - self.max_chars // 10
+            cut_iter = self.text_buffer.get_iter_at_offset(char_count - keep_chars)
+            delete_lines = max(delete_lines, cut_iter.get_line() + 1)
+        delete_lines = min(delete_lines, line_count - 1)
+        if delete_lines <= 0:
+            return
+        
+        start_iter = self.text_buffer.get_start_iter()
+        _, cut_iter = self.text_buffer.get_iter_at_line(delete_lines)
+        self.text_buffer.delete(start_iter, cut_iter)
+        self.dropped_lines += delete_lines - (1 if has_marker else 0)
+        
+        # Replace the old marker with one counting all dropped lines
+        start_iter = self.text_buffer.get_start_iter()
+        self.text_buffer.insert_with_tags_by_name(
+            start_iter,
+            f"[... {self.dropped_lines} older lines dropped ...]\n",
+            "dropped"
+        )
@@ -0,0 +1,171 @@
+import os
+import time
+import codecs
+import selectors
+import threading
+import logging
+
+logger = logging.getLogger('umu-launcher')
+
+class OutputReader:
+    """
+    Reads the output pipes of all running games in a single thread
+
+    Pipes are read in binary mode and decoded incrementally as UTF-8, so a
+    multi-byte character split across reads is decoded correctly and bad
+    bytes are replaced instead of stopping the reader. Lines longer than
+    max_line_length are broken up, so a game writing without newlines
+    can't make the launcher buffer without limit. A bare carriage return,
+    as written by progress output that redraws one line, ends a line like
+    a newline does.
+    """
+
+    # Bytes read from a pipe per wakeup
+    READ_SIZE = 65536
+
+    def __init__(self, max_line_length=65536):
+        """
+        Args:
+            max_line_length: Longest line passed on, longer lines are split
+        """
+        self.max_line_length = max_line_length
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending = []  # Streams waiting to be registered by the reader thread
+        self._thread = None
+        # Wakes the reader thread up when a stream is added
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_write, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ, None)
+
+    def add(self, pipe, on_line, on_close=None):
+        """
+        Start reading a pipe
+
+        Args:
+            pipe: Binary pipe of a subprocess (stdout or stderr)
+            on_line: Called with each decoded line, newline included (from the reader thread)
+            on_close: Called once the pipe reaches end of file (from the reader thread)
+        """
+        stream = _Stream(pipe, on_line, on_close)
+        with self._lock:
+            self._pending.append(stream)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        try:
+            os.write(self._wakeup_write, b'\0')
+        except BlockingIOError:
+            pass  # A wakeup is already pending
+
+    def _run(self):
+        while True:
+            with self._lock:
+                pending = self._pending
+                self._pending = []
+            for stream in pending:
+                try:
+                    self._selector.register(stream.fd, selectors.EVENT_READ, stream)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Error reading game output: {e}")
+                    self._close(stream)
+            try:
+                events = self._selector.select()
+            except (OSError, ValueError) as e:
+                logger.error(f"Error waiting for game output: {e}")
+                self._drop_invalid()
+                continue
+            for key, _ in events:
+                if key.data is None:
+                    os.read(self._wakeup_read, 4096)
+                    continue
+                self._read(key.data)
+
+    def _drop_invalid(self):
+        """Close the streams whose file descriptor is no longer valid"""
+        invalid = []
+        for key in list(self._selector.get_map().values()):
+            if key.data is None:
+                continue
+            try:
+                os.fstat(key.fd)
+            except OSError:
+                invalid.append(key.data)
+        for stream in invalid:
+            self._close(stream)
+        if not invalid:
+            # Nothing to drop, don't spin on a selector that keeps failing
+            time.sleep(1)
+
+    def _read(self, stream):
+        """Read what is available from a stream and pass on complete lines"""
+        try:
+            data = os.read(stream.fd, self.READ_SIZE)
+        except OSError as e:
+            logger.error(f"Error reading game output: {e}")
+            data = b''
+
+        if data:
+            stream.buffer += stream.decoder.decode(data)
+        else:
+            # End of file, flush the decoder and any unterminated last line
+            stream.buffer += stream.decoder.decode(b'', final=True)
+
+        # A trailing \r may be the first half of a \r\n split across reads
+        text = stream.buffer
+        tail = ''
+        if data and text.endswith('\r'):
+            text, tail = text[:-1], '\r'
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        lines = text.split('\n')
+        stream.buffer = lines.pop() + tail
+        limit = self.max_line_length
+        for line in lines:
+            while len(line) > limit:
+                self._emit(stream, line[:limit] + '\n')
+                line = line[limit:]
+            self._emit(stream, line + '\n')
+
+        # Break up a line that has grown past the limit
+        while len(stream.buffer) > limit:
+            self._emit(stream, stream.buffer[:limit] + '\n')
+            stream.buffer = stream.buffer[limit:]
+
+        if not data:
+            if stream.buffer:
+                self._emit(stream, stream.buffer)
+                stream.buffer = ''
+            self._close(stream)
+
+    def _emit(self, stream, line):
+        try:
+            stream.on_line(line)
+        except Exception as e:
+            logger.error(f"Error logging output: {e}")
+
+    def _close(self, stream):
+        try:
+            self._selector.unregister(stream.fd)
+        except (KeyError, ValueError, OSError):
+            pass
+        try:
+            stream.pipe.close()
+        except OSError:
+            pass
+        if stream.on_close:
+            try:
+                stream.on_close()
+            except Exception as e:
+                logger.error(f"Error closing game output: {e}")
+
+class _Stream:
+    """State of one pipe being read"""
+
+    def __init__(self, pipe, on_line, on_close):
+        self.pipe = pipe
+        self.fd = pipe.fileno()
+        self.on_line = on_line
+        self.on_close = on_close
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.buffer = ''
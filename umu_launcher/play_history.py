@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger('umu-launcher')
+
+class PlayHistory:
+    """SQLite-backed store of play sessions with per-game aggregates"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            game_path TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            ended_at REAL,
+            duration REAL,
+            exit_code INTEGER,
+            flags TEXT,
+            protonpath TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_game
+            ON sessions (game_path, started_at);
+
+        CREATE TABLE IF NOT EXISTS game_stats (
+            game_path TEXT PRIMARY KEY,
+            session_count INTEGER NOT NULL DEFAULT 0,
+            total_playtime REAL NOT NULL DEFAULT 0,
+            last_played REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_game_stats_last_played
+            ON game_stats (last_played);
+    """
+
+    def __init__(self, db_path=None):
+        """
+        Open (and create if needed) the play history database
+
+        Args:
+            db_path: Path to the SQLite file (default: ~/.local/state/umu-launcher/history.sqlite3)
+        """
+        if db_path is None:
+            db_path = os.path.expanduser('~/.local/state/umu-launcher/history.sqlite3')
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        # Sessions are closed from the GTK main loop as well as from
+        # helper threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def start_session(self, game_path, flags=None, protonpath=None):
+        """
+        Record the start of a play session
+
+        Args:
+            game_path: Path of the game executable
+            flags: Launch flags used for this session
+            protonpath: PROTONPATH used for this session
+
+        Returns:
+            int: Session id to pass to end_session()
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO sessions (game_path, started_at, flags, protonpath) VALUES (?, ?, ?, ?)",
+                (game_path, time.time(), json.dumps(flags or {}, sort_keys=True), protonpath)
+            )
+            return cursor.lastrowid
+
+    def end_session(self, session_id, exit_code=None):
+        """
+        Record the end of a play session and update the game's aggregates
+
+        Args:
+            session_id: Id returned by start_session()
+            exit_code: Exit code of the game process, if known
+        """
+        ended_at = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT game_path, started_at, ended_at FROM sessions WHERE id = ?",
+                (session_id,)
+            ).fetchone()
+            if row is None or row['ended_at'] is not None:
+                return
+
+            duration = max(0.0, ended_at - row['started_at'])
+            self._conn.execute(
+                "UPDATE sessions SET ended_at = ?, duration = ?, exit_code = ? WHERE id = ?",
+                (ended_at, duration, exit_code, session_id)
+            )
+            self._conn.execute(
+                """
+                INSERT INTO game_stats (game_path, session_count, total_playtime, last_played)
+                VALUES (?, 1, ?, ?)
+                ON CONFLICT (game_path) DO UPDATE SET
+                    session_count = session_count + 1,
+                    total_playtime = total_playtime + excluded.total_playtime,
+                    last_played = MAX(COALESCE(last_played, 0), excluded.last_played)
+                """,
+                (row['game_path'], duration, ended_at)
+            )
+
+    def get_stats(self, game_path):
+        """
+        Get aggregate statistics for a game
+
+        Returns:
+            dict: session_count, total_playtime, last_played and average_session_length
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT session_count, total_playtime, last_played FROM game_stats WHERE game_path = ?",
+                (game_path,)
+            ).fetchone()
+        if row is None:
+            return {
+                'session_count': 0,
+                'total_playtime': 0.0,
+                'last_played': None,
+                'average_session_length': 0.0
+            }
+        return {
+            'session_count': row['session_count'],
+            'total_playtime': row['total_playtime'],
+            'last_played': row['last_played'],
+            'average_session_length': row['total_playtime'] / row['session_count'] if row['session_count'] else 0.0
+        }
+
+    def recently_played(self, limit=None):
+        """
+        Get game paths ordered by most recently played
+
+        Args:
+            limit: Maximum number of paths to return (all if None)
+        """
+        query = "SELECT game_path FROM game_stats WHERE last_played IS NOT NULL ORDER BY last_played DESC"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            return [row['game_path'] for row in self._conn.execute(query, params)]
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
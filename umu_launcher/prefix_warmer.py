@@ -0,0 +1,95 @@
+import os
+import time
+import subprocess
+import logging
+from .launch_scheduler import is_prefix_initialized
+
+logger = logging.getLogger('umu-launcher')
+
+class PrefixWarmer:
+    """
+    Keeps a persistent wineserver running for a prefix ahead of a launch
+
+    The server is started with Proton's own wineserver binary so its
+    protocol matches the Wine the game will run under, and with -p so it
+    shuts itself down after idle_timeout seconds without clients. A game
+    launched while it is up attaches to it instead of starting a new one.
+    """
+
+    # Locations of wineserver inside a Proton/UMU-Proton tree
+    WINESERVER_PATHS = (
+        os.path.join('files', 'bin', 'wineserver'),
+        os.path.join('dist', 'bin', 'wineserver'),
+    )
+
+    def __init__(self, idle_timeout=300):
+        """
+        Args:
+            idle_timeout: Seconds a warm wineserver stays up without clients
+        """
+        self.idle_timeout = idle_timeout
+        self.servers = {}  # prefix -> (Popen, start time)
+
+    def find_wineserver(self, protonpath):
+        """Find the wineserver binary shipped with a Proton build"""
+        for relative_path in self.WINESERVER_PATHS:
+            path = os.path.join(protonpath, relative_path)
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
+        return None
+
+    def is_warm(self, prefix):
+        """Check whether a warm wineserver started by us is still running"""
+        prefix = os.path.realpath(os.path.expanduser(prefix))
+        server = self.servers.get(prefix)
+        if server is None:
+            return False
+        if server[0].poll() is not None:
+            del self.servers[prefix]
+            return False
+        return True
+
+    def warm(self, prefix, protonpath):
+        """
+        Start a persistent wineserver for a prefix if one is not running
+
+        Prefixes that have not been created yet are left alone, umu-run
+        has to set those up itself.
+
+        Returns:
+            bool: True if a warm server is running for the prefix
+        """
+        prefix = os.path.realpath(os.path.expanduser(prefix))
+        if self.is_warm(prefix):
+            return True
+        if not is_prefix_initialized(prefix):
+            logger.debug(f"Not pre-warming uninitialized prefix {prefix}")
+            return False
+
+        wineserver = self.find_wineserver(protonpath)
+        if not wineserver:
+            logger.debug(f"No wineserver found in PROTONPATH {protonpath}")
+            return False
+
+        # umu-run links <prefix>/pfx back to the prefix, Wine itself uses the prefix
+        env = os.environ.copy()
+        env['WINEPREFIX'] = prefix
+        try:
+            process = subprocess.Popen(
+                [wineserver, '-f', f'-p{self.idle_timeout}'],
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            logger.error(f"Error starting wineserver for {prefix}: {e}")
+            return False
+
+        # If another server already owns the prefix this one exits at once,
+        # which is_warm() notices on the next check
+        self.servers[prefix] = (process, time.monotonic())
+        logger.info(f"Pre-warmed wineserver for {prefix} (idle timeout {self.idle_timeout}s)")
+        return True
+
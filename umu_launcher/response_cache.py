@@ -0,0 +1,180 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger('umu-launcher')
+
+class CachedResponse:
+    """A response body stored in the ResponseCache"""
+
+    def __init__(self, url, body, etag, last_modified, fetched_at):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def age(self, now=None):
+        """Seconds since the response was fetched or last revalidated"""
+        return (now if now is not None else time.time()) - self.fetched_at
+
+    def validators(self):
+        """
+        Conditional request headers for revalidating the response
+
+        Returns:
+            dict: If-None-Match and/or If-Modified-Since headers
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """
+    SQLite-backed cache of HTTP response bodies
+
+    Entries are kept with their ETag and Last-Modified validators so stale
+    entries can be revalidated with a conditional request. The total size
+    of the stored bodies is capped, evicting the least recently used
+    entries first.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_responses_accessed
+            ON responses (accessed_at);
+    """
+
+    def __init__(self, db_path=None, ttl=86400, max_bytes=20 * 1024 * 1024):
+        """
+        Open (and create if needed) the response cache
+
+        Args:
+            db_path: Path to the SQLite file (default: ~/.cache/umu-launcher/responses.sqlite3)
+            ttl: Seconds a response is used without revalidating it
+            max_bytes: Total size of the cached bodies
+        """
+        if db_path is None:
+            db_path = os.path.expanduser('~/.cache/umu-launcher/responses.sqlite3')
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+        # Requests run on the client's thread pool, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+
+    def get(self, url):
+        """
+        Look up a cached response
+
+        Args:
+            url: URL the response was fetched from
+
+        Returns:
+            CachedResponse: The entry, fresh or stale, or None if not cached
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT url, body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?",
+                (time.time(), url)
+            )
+        return CachedResponse(row['url'], bytes(row['body']), row['etag'], row['last_modified'], row['fetched_at'])
+
+    def is_fresh(self, entry):
+        """True if an entry can be used without revalidating it"""
+        return entry.age() < self.ttl
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """
+        Store a response, evicting old entries to stay under max_bytes
+
+        Args:
+            url: URL the response was fetched from
+            body: Response body (bytes)
+            etag: ETag header of the response
+            last_modified: Last-Modified header of the response
+        """
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO responses (url, body, etag, last_modified, fetched_at, accessed_at, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, sqlite3.Binary(body), etag, last_modified, now, now, len(body))
+            )
+            self._evict()
+
+    def revalidated(self, url, etag=None, last_modified=None):
+        """
+        Mark an entry as fresh after the server answered 304 Not Modified
+
+        Args:
+            url: URL of the entry
+            etag: ETag header of the 304 response, if it sent a new one
+            last_modified: Last-Modified header of the 304 response
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                UPDATE responses SET fetched_at = ?, accessed_at = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+                """,
+                (now, now, etag, last_modified, url)
+            )
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits (lock held)"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        for row in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (row['url'],))
+            total -= row['size']
+
+    def size(self):
+        """Total size of the cached bodies in bytes"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
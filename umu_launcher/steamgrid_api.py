@@ -1,47 +1,436 @@
+import os
+import json
+import time
+import random
+import hashlib
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
 import requests
+from requests.adapters import HTTPAdapter
+from .utils import TokenBucket
+
+logger = logging.getLogger('umu-launcher')
+
+class RequestCancelled(Exception):
+    """Raised when a request is cancelled before its result is used"""
+
+class DownloadTooLarge(Exception):
+    """Raised when a download exceeds its size limit"""
+
+class CircuitOpen(requests.ConnectionError):
+    """Raised instead of sending a request while the API is considered down"""
+
+    retry_in = 0.0  # Seconds until a trial request may be sent
+
+class CancelToken:
+    """Cancels one or more SteamGridDB requests"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise RequestCancelled if the token was cancelled"""
+        if self._event.is_set():
+            raise RequestCancelled()
+
+    def sleep(self, seconds):
+        """Wait, raising RequestCancelled as soon as the token is cancelled"""
+        if self._event.wait(seconds):
+            raise RequestCancelled()
+
+class CircuitBreaker:
+    """
+    Stops requests to a failing API
+
+    After threshold consecutive failures the circuit opens and requests
+    fail right away for cooldown seconds. Then a single trial request is
+    let through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, threshold=5, cooldown=60, clock=time.monotonic, name="SteamGridDB"):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False  # A trial request is in flight
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def check(self):
+        """Raise CircuitOpen if a request may not be sent now"""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.cooldown - self.clock()
+            if remaining > 0:
+                error = CircuitOpen(f"{self.name} is unavailable, retrying in {remaining:.0f}s")
+                error.retry_in = remaining
+                raise error
+            if self._trial:
+                raise CircuitOpen(f"{self.name} is unavailable, checking whether it is back")
+            self._trial = True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def release(self):
+        """Give back a trial request whose outcome says nothing about the API"""
+        with self._lock:
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                if self.opened_at is None or self._trial:
+                    logger.warning(f"{self.name} keeps failing, pausing requests")
+                self.opened_at = self.clock()
+                self._trial = False
 
 class SteamGridDB:
+    """
+    SteamGridDB API client
+
+    All requests go through one requests.Session, so connections are kept
+    alive and reused, and independent requests can run in parallel on the
+    client's thread pool. Every caller shares one token bucket. Rate
+    limited (429) and server error responses and connection failures are
+    retried with exponential backoff and jitter, waiting at least as long
+    as Retry-After asks, and a circuit breaker stops requests altogether
+    while the API keeps failing. Artwork downloads come from a CDN, not
+    the API: they skip the API's rate limit and have a circuit breaker of
+    their own, so neither side's failures pause the other.
+    """
+
     BASE_URL = "https://www.steamgriddb.com/api/v2"
-    
-    def __init__(self, api_key: str):
+
+    # Overrides BASE_URL, e.g. to use benchmarks/steamgrid_stub.py
+    BASE_URL_ENV = "STEAMGRIDDB_BASE_URL"
+
+    # Kinds of artwork that can be fetched for a game
+    ARTWORK_KINDS = ('icons', 'grids', 'heroes', 'logos')
+
+    # Bytes read at a time when streaming a download
+    CHUNK_SIZE = 65536
+
+    # Endpoints whose responses are kept in the response cache
+    CACHED_PATHS = ('search/autocomplete/', 'icons/game/')
+
+    # Longest Retry-After honored, longer waits fail the request instead
+    MAX_RETRY_AFTER = 120
+
+    def __init__(self, api_key: str, base_url: str = None, max_workers: int = 4, timeout: float = 10,
+                 cache=None, rate: float = 10, burst: int = 20, max_retries: int = 3,
+                 backoff: float = 0.5, max_backoff: float = 30):
         """
         Initialize the SteamGridDB API client.
-        
+
         Args:
             api_key (str): Your SteamGridDB API key
+            base_url (str): API base URL (default: $STEAMGRIDDB_BASE_URL or BASE_URL)
+            max_workers (int): Requests run in parallel by the thread pool
+            timeout (float): Connect and read timeout of each request in seconds
+            cache (ResponseCache): Cache for search and icon listing responses
+            rate (float): Requests per second across all callers (0 for no limit)
+            burst (int): Requests that may be sent at once before the rate applies
+            max_retries (int): Retries of a failed request
+            backoff (float): Delay before the first retry in seconds, doubled for each retry
+            max_backoff (float): Longest delay between retries in seconds
         """
+        self.base_url = (base_url or os.environ.get(self.BASE_URL_ENV) or self.BASE_URL).rstrip('/')
+        self.timeout = timeout
+        self.cache = cache
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = CircuitBreaker()
+        self.download_breaker = CircuitBreaker(name="SteamGridDB image server")
+        self._paused_until = 0.0  # Set by Retry-After, holds every caller
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers * 2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='steamgrid')
         self.api_key = api_key
-        self.headers = {
+
+    @property
+    def api_key(self):
+        return self._api_key
+
+    @api_key.setter
+    def api_key(self, api_key):
+        self._api_key = api_key
+        self.session.headers.update({
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
-        }
-    
-    def search_games(self, query: str) -> list:
+        })
+
+    @property
+    def headers(self):
+        return dict(self.session.headers)
+
+    def _wait(self, seconds: float, cancel: CancelToken = None):
+        if cancel:
+            cancel.sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    def _throttle(self, cancel: CancelToken = None):
+        """Wait for a Retry-After pause and the token bucket"""
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            self._wait(pause, cancel)
+        if self.bucket:
+            while not self.bucket.acquire(timeout=0.5):
+                if cancel:
+                    cancel.check()
+        if cancel:
+            cancel.check()
+
+    def _retry_delay(self, attempt: int, response=None, pause: bool = True) -> float:
+        """
+        Delay before the next attempt
+
+        Returns:
+            float: Seconds to wait, or None if Retry-After asks for too long a wait
+
+        A 429 with Retry-After also holds every other API caller if pause is set.
+        """
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+        # Jitter so parallel callers don't retry in lockstep
+        delay = random.uniform(delay / 2, delay)
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                seconds = float(retry_after)
+            except ValueError:
+                try:
+                    seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    seconds = 0
+            if seconds > self.MAX_RETRY_AFTER:
+                return None
+            delay = max(delay, seconds)
+            if pause and response.status_code == 429:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def _request(self, url: str, cancel: CancelToken = None, download: bool = False, **kwargs):
+        """
+        GET a URL with rate limiting, retries and the circuit breaker
+
+        Args:
+            download: The URL is an artwork file, use the download breaker
+                instead of the API's rate limit and breaker
+
+        Returns:
+            Response: The response, an error response if retries ran out
+
+        Raises:
+            CircuitOpen: The API is considered down
+            RequestCancelled: The token was cancelled
+        """
+        breaker = self.download_breaker if download else self.breaker
+        for attempt in range(self.max_retries + 1):
+            if download:
+                if cancel:
+                    cancel.check()
+            else:
+                self._throttle(cancel)
+            breaker.check()
+            try:
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                breaker.failure()
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.debug(f"Retrying SteamGridDB request after error: {e}")
+            except Exception:
+                # Not worth retrying and not an outage (bad URL and the like)
+                breaker.release()
+                raise
+            else:
+                if response.status_code != 429 and response.status_code < 500:
+                    breaker.success()
+                    return response
+                # Rate limiting means the server is up
+                if response.status_code >= 500:
+                    breaker.failure()
+                else:
+                    breaker.release()
+                delay = self._retry_delay(attempt, response, pause=not download)
+                if attempt == self.max_retries or delay is None:
+                    return response
+                response.close()
+                logger.debug(f"Retrying SteamGridDB request after HTTP {response.status_code}")
+            self._wait(delay, cancel)
+
+    def _get(self, path: str, cancel: CancelToken = None) -> list:
+        """Get the data list of an API endpoint"""
+        if cancel:
+            cancel.check()
+        url = f"{self.base_url}/{path}"
+        if self.cache is None or not path.startswith(self.CACHED_PATHS):
+            response = self._request(url, cancel)
+            if cancel:
+                cancel.check()
+            response.raise_for_status()
+            return response.json().get('data', [])
+        return self._get_cached(url, cancel)
+
+    def _get_cached(self, url: str, cancel: CancelToken = None) -> list:
+        """Get the data list of an API endpoint through the response cache"""
+        try:
+            entry = self.cache.get(url)
+        except Exception as e:
+            logger.error(f"Error reading SteamGridDB response cache: {e}")
+            entry = None
+        if entry and self.cache.is_fresh(entry):
+            return json.loads(entry.body).get('data', [])
+
+        try:
+            response = self._request(url, cancel, headers=entry.validators() if entry else None)
+        except requests.RequestException as e:
+            if entry is None:
+                raise
+            # Offline, a stale answer beats none
+            logger.warning(f"Using cached SteamGridDB response, request failed: {e}")
+            return json.loads(entry.body).get('data', [])
+        if cancel:
+            cancel.check()
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 304 and entry:
+            try:
+                self.cache.revalidated(url, etag, last_modified)
+            except Exception as e:
+                logger.error(f"Error updating SteamGridDB response cache: {e}")
+            return json.loads(entry.body).get('data', [])
+        if response.status_code >= 500 and entry:
+            logger.warning(f"Using cached SteamGridDB response, server returned {response.status_code}")
+            return json.loads(entry.body).get('data', [])
+
+        response.raise_for_status()
+        data = response.json().get('data', [])
+        try:
+            self.cache.store(url, response.content, etag, last_modified)
+        except Exception as e:
+            logger.error(f"Error updating SteamGridDB response cache: {e}")
+        return data
+
+    def search_games(self, query: str, cancel: CancelToken = None) -> list:
         """
         Search for games in SteamGridDB.
-        
+
         Args:
             query (str): The game title to search for
-            
+            cancel (CancelToken): Token to cancel the request
+
         Returns:
             list: List of games matching the search query
         """
-        endpoint = f"{self.BASE_URL}/search/autocomplete/{query}"
-        response = requests.get(endpoint, headers=self.headers)
-        response.raise_for_status()
-        return response.json().get('data', [])
-    
-    def get_icons(self, game_id: int) -> list:
+        return self._get(f"search/autocomplete/{quote(query, safe='')}", cancel)
+
+    def get_artwork(self, kind: str, game_id: int, cancel: CancelToken = None) -> list:
+        """
+        Get artwork of one kind for a specific game.
+
+        Args:
+            kind (str): One of ARTWORK_KINDS
+            game_id (int): The SteamGridDB game ID
+            cancel (CancelToken): Token to cancel the request
+
+        Returns:
+            list: List of artwork available for the game
+        """
+        if kind not in self.ARTWORK_KINDS:
+            raise ValueError(f"Unknown artwork kind: {kind}")
+        return self._get(f"{kind}/game/{int(game_id)}", cancel)
+
+    def get_icons(self, game_id: int, cancel: CancelToken = None) -> list:
         """
         Get icons for a specific game.
-        
+
         Args:
             game_id (int): The SteamGridDB game ID
-            
+            cancel (CancelToken): Token to cancel the request
+
         Returns:
             list: List of icons available for the game
         """
-        endpoint = f"{self.BASE_URL}/icons/game/{game_id}"
-        response = requests.get(endpoint, headers=self.headers)
-        response.raise_for_status()
-        return response.json().get('data', [])
+        return self.get_artwork('icons', game_id, cancel)
+
+    def download_to(self, f, url: str, max_bytes: int = None, cancel: CancelToken = None) -> tuple:
+        """
+        Stream an artwork file into a file object without holding it in memory.
+
+        Args:
+            f: Binary file object to write to
+            url (str): URL of the file
+            max_bytes (int): Largest file accepted (None for no limit)
+            cancel (CancelToken): Token to cancel the download
+
+        Returns:
+            tuple: Content-Type header and SHA-256 hex digest of the content
+
+        Raises:
+            DownloadTooLarge: The file is larger than max_bytes
+        """
+        if cancel:
+            cancel.check()
+        sha = hashlib.sha256()
+        size = 0
+        with self._request(url, cancel, download=True, headers={"Authorization": None}, stream=True) as response:
+            response.raise_for_status()
+            length = response.headers.get('Content-Length', '')
+            if max_bytes and length.isdigit() and int(length) > max_bytes:
+                raise DownloadTooLarge(f"{url} is {length} bytes, the limit is {max_bytes}")
+            for chunk in response.iter_content(self.CHUNK_SIZE):
+                if cancel:
+                    cancel.check()
+                size += len(chunk)
+                # Content-Length may be missing or wrong
+                if max_bytes and size > max_bytes:
+                    raise DownloadTooLarge(f"{url} is over the limit of {max_bytes} bytes")
+                sha.update(chunk)
+                f.write(chunk)
+            return response.headers.get('Content-Type'), sha.hexdigest()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run a client call on the thread pool.
+
+        Returns:
+            Future: Future of the call's result
+        """
+        return self.executor.submit(fn, *args, **kwargs)
+
+    def close(self):
+        """Cancel queued requests and close pooled connections."""
+        try:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        except TypeError:
+            # Python 3.8 can't cancel queued futures
+            self.executor.shutdown(wait=False)
+        self.session.close()
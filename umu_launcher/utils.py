@@ -1,4 +1,6 @@
+import time
 import struct
+import threading
 import magic
 
 def is_windows_executable(file_path):
@@ -25,3 +27,112 @@ def is_windows_executable(file_path):
             
     except Exception:
         return False
+
+# Leading bytes of the image formats artwork is served in
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'\x00\x00\x01\x00', 'image/x-icon'),
+)
+
+def image_mime_type(file_path):
+    """
+    Get the MIME type of an image file from its content
+
+    Returns:
+        str: MIME type, or None if the file isn't an image
+    """
+    try:
+        # First try using python-magic
+        mime_type = magic.from_file(file_path, mime=True)
+        if mime_type and mime_type.startswith('image/'):
+            return mime_type
+    except Exception:
+        pass
+
+    # Fallback: Check the file signature
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(12)
+    except OSError:
+        return None
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    return None
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter
+
+    Tokens are added at rate per second up to capacity; each event takes
+    one or more tokens.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (the allowed burst)
+            clock: Monotonic clock in seconds
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens if they are available
+
+        Returns:
+            bool: True if the tokens were taken
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def wait_time(self, tokens=1):
+        """Seconds until the given number of tokens is available"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens or self.rate <= 0:
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Wait until tokens are available and take them
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None to wait as long as needed)
+
+        Returns:
+            bool: True if the tokens were taken, False on timeout
+        """
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            if self.try_acquire(tokens):
+                return True
+            delay = self.wait_time(tokens)
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(max(delay, 0.001))